@@ -0,0 +1,55 @@
+# cost of making and checking check-in tokens, and the memory of a full replay cache
+# usage: python benchmarks/bench_checkintoken.py [aantal tokens]
+import os
+import secrets
+import sys
+import time
+import tracemalloc
+import uuid
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+import checkintoken
+
+geheim = secrets.token_hex(32)
+
+
+def per_keer(functie, waarden):
+    start = time.perf_counter()
+    for waarde in waarden:
+        functie(waarde)
+    return (time.perf_counter() - start) / len(waarden) * 1e6
+
+
+def main(aantal):
+    les_id = str(uuid.uuid4())
+    studenten = [str(1000000 + i) for i in range(aantal)]
+    les_token = checkintoken.les_token(geheim, les_id, 30)
+    tokens = [checkintoken.student_token(geheim, les_id, nr) for nr in studenten]
+    verloopt = time.time() + 900
+
+    print(f'{aantal} tokens')
+    print(f'{"":<24}{"us per keer":>12}')
+    for naam, functie, waarden in (
+            ('qr token maken', lambda nr: checkintoken.les_token(geheim, les_id, 30), studenten),
+            ('qr token controleren', lambda nr: checkintoken.les_geldig(geheim, les_id, les_token, 30, 120), studenten),
+            ('formulier token maken', lambda nr: checkintoken.student_token(geheim, les_id, nr), studenten),
+            ('formulier controleren', lambda paar: checkintoken.student_verloopt(geheim, les_id, *paar, 900), list(zip(studenten, tokens)))):
+        print(f'{naam:<24}{per_keer(functie, waarden):>12.2f}')
+
+    gebruikt = checkintoken.Gebruikt(maxsize=aantal)
+    tijd = per_keer(lambda token: gebruikt.eerste_keer(token, verloopt), tokens)
+    # the same again under tracemalloc, which slows it down too much to time it
+    tracemalloc.start()
+    vol = checkintoken.Gebruikt(maxsize=aantal)
+    for token in tokens:
+        vol.eerste_keer(token, verloopt)
+    geheugen = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f'{"replay cache":<24}{tijd:>12.2f}  {geheugen / 1024 / 1024:.1f} MB voor {len(gebruikt.tokens)} tokens')
+    print(f'{"replay geweigerd":<24}{per_keer(lambda token: gebruikt.eerste_keer(token, verloopt), tokens[:1000]):>12.2f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
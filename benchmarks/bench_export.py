@@ -0,0 +1,64 @@
+# streams an export of N les_inschrijving rows and samples memory on the way, it should stay flat
+# usage: python benchmarks/bench_export.py [aantal rijen] [csv|kolom]
+import os
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+
+
+def maak_database(tmp, aantal):
+    shutil.copy(os.path.join(repo, 'hro.sqlite'), os.path.join(tmp, 'hro.sqlite'))
+    conn = sqlite3.connect(os.path.join(tmp, 'hro.sqlite'))
+    studenten = list(range(600000, 602000))
+    lessen = [str(uuid.uuid4()) for _ in range(aantal // len(studenten) + 1)]
+    conn.executemany('INSERT INTO student VALUES (?, ?)', ((nr, f'Export student {nr}') for nr in studenten))
+    conn.executemany("INSERT INTO les VALUES (?, ?, datetime('2023-09-01', '+' || ? || ' hours'), 'closed')",
+                     ((les, i % 6 + 1, i) for i, les in enumerate(lessen)))
+    conn.executemany('INSERT INTO les_inschrijving (studentnummer, docent_id, les_id, aanwezigheid_check) VALUES (?, ?, ?, ?)',
+                     ((studenten[i % len(studenten)], 901 + i % 7, lessen[i // len(studenten)], i % 3) for i in range(aantal)))
+    conn.commit()
+    conn.close()
+
+
+def main(aantal, formaat):
+    tmp = tempfile.mkdtemp()
+    maak_database(tmp, aantal)
+    from main import create_app
+
+    client = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'hro.sqlite'),
+                         'TAKEN_PAD': os.path.join(tmp, 'taken.sqlite')}).test_client()
+    with client.session_transaction() as session:
+        session['user'] = '901'
+        session['rights'] = True
+
+    start = time.perf_counter()
+    geheugen = [rss_mb()]
+    response = client.get(f'/export/aanwezigheid.{formaat}', buffered=False)
+    grootte = 0
+    for i, stuk in enumerate(response.response):
+        grootte += len(stuk)
+        if i % 50 == 0:
+            geheugen.append(rss_mb())
+    duur = time.perf_counter() - start
+    geheugen.append(rss_mb())
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f'{aantal} rijen als {formaat}: {grootte / 1024 / 1024:.1f} MB in {duur:.1f} s ({aantal / duur:.0f} rijen/s)')
+    print(f'geheugen (RSS) start {geheugen[0]:.0f} MB, na eerste chunks {geheugen[2]:.0f} MB, '
+          f'halverwege {geheugen[len(geheugen) // 2]:.0f} MB, einde {geheugen[-1]:.0f} MB')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000, sys.argv[2] if len(sys.argv) > 2 else 'csv')
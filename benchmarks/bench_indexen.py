@@ -0,0 +1,87 @@
+# per-query latency of the hot lookups at 100k enrollments, before and after the index migration
+# usage: python benchmarks/bench_indexen.py [aantal inschrijvingen]
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import migrate
+
+# schema of hro.sqlite before migration 001
+oud_schema = '''
+CREATE TABLE student (studentnummer INTEGER NOT NULL PRIMARY KEY, naam VARCHAR(150) NOT NULL);
+CREATE TABLE docent (docent_id INTEGER NOT NULL PRIMARY KEY, naam VARCHAR(150) NOT NULL);
+CREATE TABLE klas (klascode VARCHAR(150) NOT NULL PRIMARY KEY, slc_docent VARCHAR(150));
+CREATE TABLE vak (vak_id INTEGER NOT NULL PRIMARY KEY, vak VARCHAR(150) NOT NULL);
+CREATE TABLE les (les_id VARCHAR(100) NOT NULL PRIMARY KEY, vak_id INTEGER NOT NULL, datum DATETIME NOT NULL, entry VARCHAR(6) NOT NULL DEFAULT 'opened');
+CREATE TABLE klas_inschrijving (klasinschrijving_id INTEGER NOT NULL PRIMARY KEY, studentnummer INTEGER NOT NULL, klascode VARCHAR(2) NOT NULL);
+CREATE TABLE les_inschrijving (id INTEGER PRIMARY KEY, studentnummer INTEGER NOT NULL, docent_id INTEGER NOT NULL, les_id INTEGER NOT NULL,
+    aanwezigheid_check INTEGER NOT NULL DEFAULT 'Afwezig', afwezigheid_rede VARCHAR (200), motivatie INTEGER (1, 10));
+'''
+
+# the lookups done by lesaanwezigheid, data, getstudentlessen, getlessen and getstudenten
+queries = {
+    'les roster': ('SELECT * FROM les_inschrijving WHERE les_id = ?', 'les'),
+    'check-in': ('SELECT id FROM les_inschrijving WHERE les_id = ? AND studentnummer = ?', 'les_student'),
+    'aanwezig count': ('SELECT COUNT(*) FROM les_inschrijving WHERE les_id = ? AND aanwezigheid_check = 1', 'les'),
+    'student lessen': ('SELECT * FROM les_inschrijving WHERE studentnummer = ?', 'student'),
+    'docent lessen': ('SELECT DISTINCT les_id FROM les_inschrijving WHERE docent_id = ?', 'docent'),
+    'klas studenten': ('SELECT studentnummer FROM klas_inschrijving WHERE klascode = ?', 'klas'),
+}
+
+
+def vul(conn, aantal):
+    studenten = max(aantal // 20, 100)
+    klassen = [f'k{i}' for i in range(max(studenten // 30, 1))]
+    lessen = [str(uuid.uuid4()) for _ in range(max(aantal // 30, 1))]
+    conn.executemany('INSERT INTO student VALUES (?, ?)', ((i, f'student {i}') for i in range(studenten)))
+    conn.executemany('INSERT INTO docent VALUES (?, ?)', ((900 + i, f'docent {i}') for i in range(20)))
+    conn.executemany('INSERT INTO klas VALUES (?, ?)', ((k, None) for k in klassen))
+    conn.executemany('INSERT INTO klas_inschrijving (studentnummer, klascode) VALUES (?, ?)', ((i, klassen[i % len(klassen)]) for i in range(studenten)))
+    conn.executemany('INSERT INTO les VALUES (?, 1, ?, ?)', ((les, '2023-01-01 09:00:00', 'opened') for les in lessen))
+    rijen = ((i % studenten, 900 + (i // 30) % 20, lessen[i // 30 % len(lessen)], random.choice([1, 2, 'Afwezig'])) for i in range(aantal))
+    conn.executemany('INSERT INTO les_inschrijving (studentnummer, docent_id, les_id, aanwezigheid_check) VALUES (?, ?, ?, ?)', rijen)
+    conn.commit()
+    return {'les': lessen, 'student': list(range(studenten)), 'docent': list(range(900, 920)), 'klas': klassen}
+
+
+def meet(conn, data, herhalingen=200):
+    result = {}
+    for naam, (sql, soort) in queries.items():
+        start = time.perf_counter()
+        for _ in range(herhalingen):
+            if soort == 'les_student':
+                params = (random.choice(data['les']), random.choice(data['student']))
+            else:
+                params = (random.choice(data[soort]),)
+            conn.execute(sql, params).fetchall()
+        result[naam] = (time.perf_counter() - start) / herhalingen * 1000
+    return result
+
+
+def main(aantal):
+    with tempfile.TemporaryDirectory() as tmp:
+        pad = os.path.join(tmp, 'bench.sqlite')
+        conn = sqlite3.connect(pad)
+        conn.executescript(oud_schema)
+        data = vul(conn, aantal)
+        voor = meet(conn, data)
+        conn.close()
+
+        migrate.migreer(pad)
+        conn = sqlite3.connect(pad)
+        na = meet(conn, data)
+        conn.close()
+
+    print(f'{aantal} les_inschrijving rijen, ms per query')
+    print(f'{"query":<16}{"zonder index":>14}{"met index":>12}')
+    for naam in queries:
+        print(f'{naam:<16}{voor[naam]:>14.3f}{na[naam]:>12.3f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
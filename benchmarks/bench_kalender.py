@@ -0,0 +1,58 @@
+# calendar feeds of many students polled in a row: first fetch, fetch from the cache, 304 with the etag
+# usage: python benchmarks/bench_kalender.py [database van genereer.py] [aantal abonnees]
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+import genereer
+import kalender
+
+
+def main(database, aantal):
+    tmp = tempfile.mkdtemp()
+    pad = os.path.join(tmp, 'hro.sqlite')
+    if database:
+        shutil.copy(database, pad)
+    else:
+        genereer.genereer(pad, studenten=5000, klassen=200, inschrijvingen=200000)
+    conn = sqlite3.connect(pad)
+    studenten = [nr for nr, in conn.execute('SELECT studentnummer FROM student ORDER BY studentnummer DESC LIMIT ?', (aantal,))]
+    conn.close()
+
+    from main import create_app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + pad, 'LOG_NIVEAU': 'WARNING'})
+    client = app.test_client(use_cookies=False)
+    urls = [f"/kalender/{kalender.token(app.config['KALENDER_SECRET'], 'student', nr)}.ics" for nr in studenten]
+
+    etags = {}
+
+    def ronde(naam, voorwaardelijk):
+        tijden = []
+        for url in urls:
+            headers = {'If-None-Match': etags[url]} if voorwaardelijk else {}
+            start = time.perf_counter()
+            response = client.get(url, headers=headers)
+            response.get_data()
+            tijden.append((time.perf_counter() - start) * 1000)
+            etags[url] = response.headers['ETag'].strip('"')
+        tijden.sort()
+        print(f'{naam:<14}{len(tijden) / sum(tijden) * 1000:>10.0f}{statistics.median(tijden):>10.2f}{tijden[int(len(tijden) * 0.99) - 1]:>10.2f}'
+              f'  {response.status_code}')
+
+    print(f'{len(urls)} abonnees')
+    print(f'{"":<14}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}  status')
+    ronde('eerste keer', False)
+    ronde('uit de cache', False)
+    ronde('met etag', True)
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != '-' else None, int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
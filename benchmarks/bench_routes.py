@@ -0,0 +1,174 @@
+# throughput and p50/p95/p99 latency of the main routes through the flask test client, on generated data
+# results go to a json file, --vergelijk prints the change against an earlier one
+# usage: python benchmarks/bench_routes.py [--database pad] [--verzoeken 500] [--uitvoer resultaat.json] [--vergelijk oud.json]
+#        without --database a database is generated first, at the scale given with the options of genereer.py
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+import checkintoken
+import genereer
+
+routes = ['getstudentlessen', 'getlessen', 'lesaanwezigheid', 'addlesson', 'data', 'getstudentoverzicht']
+
+
+# enrollments, lessons, classes and teachers the requests pick from, the same every run
+def steekproef(pad, rng, aantal=1000):
+    conn = sqlite3.connect(pad)
+    laagste, hoogste = conn.execute('SELECT MIN(id), MAX(id) FROM les_inschrijving').fetchone()
+    ids = sorted(rng.randint(laagste, hoogste) for _ in range(aantal))
+    inschrijvingen = conn.execute(f'SELECT les_id, studentnummer, docent_id FROM les_inschrijving WHERE id IN ({",".join("?" * len(ids))})',
+                                  ids).fetchall()
+    klassen = [k for k, in conn.execute('SELECT klascode FROM klas WHERE klascode IN (SELECT klascode FROM klas_inschrijving)')]
+    docenten = conn.execute('SELECT naam FROM docent ORDER BY docent_id').fetchall()
+    vakken = conn.execute('SELECT vak FROM vak ORDER BY vak_id').fetchall()
+    conn.close()
+    return {'inschrijvingen': inschrijvingen, 'klassen': klassen, 'docenten': [d for d, in docenten], 'vakken': [v for v, in vakken]}
+
+
+# one request of a route: (method, url, json body, session data), geheim signs the check-in form tokens
+def verzoeken(data, rng, geheim):
+    def inschrijving():
+        return rng.choice(data['inschrijvingen'])
+
+    def getstudentlessen():
+        les, nr, docent = inschrijving()
+        return 'GET', '/getstudentlessen', None, {'user': str(nr), 'rights': False}
+
+    def getlessen():
+        les, nr, docent = inschrijving()
+        return 'GET', '/getlessen', None, {'user': str(docent), 'rights': True}
+
+    def lesaanwezigheid():
+        les, nr, docent = inschrijving()
+        return 'GET', f'/les/{les}/getaanwezigheid', None, {'user': str(docent), 'rights': True}
+
+    def addlesson():
+        datum = datetime(2030, 1, 1, 9) + timedelta(hours=rng.randrange(10000))
+        body = {'datum': datum.strftime('%Y-%m-%dT%H:%M'), 'klassen': repr([rng.choice(data['klassen'])]), 'studenten': '[]',
+                'vak': rng.choice(data['vakken']), 'docent': rng.choice(data['docenten'])}
+        return 'POST', '/addlesson', body, {'user': '901', 'rights': True}
+
+    def data_():
+        les, nr, docent = inschrijving()
+        token = checkintoken.student_token(geheim, les, str(nr))
+        return 'POST', f'/{les}/aanwezig', {'studentnummer': str(nr), 'motivatie': rng.randint(1, 10), 'token': token}, {'user': str(nr), 'rights': False}
+
+    def getstudentoverzicht():
+        les, nr, docent = inschrijving()
+        return 'GET', f'/getoverzicht/{nr}', None, {'user': str(docent), 'rights': True}
+
+    return {'getstudentlessen': getstudentlessen, 'getlessen': getlessen, 'lesaanwezigheid': lesaanwezigheid,
+            'addlesson': addlesson, 'data': data_, 'getstudentoverzicht': getstudentoverzicht}
+
+
+def percentiel(tijden, p):
+    return tijden[min(len(tijden) - 1, int(len(tijden) * p / 100))]
+
+
+# the route names are the view functions, metingen gives the sql queries per request of their endpoint
+def meet(app, client, naam, maak, aantal, opwarmen=20):
+    sessie = app.session_interface.maak
+    queries = app.extensions['hro']['metingen'].queries['hro.' + naam]
+    tijden = []
+    statussen = Counter()
+    for i in range(opwarmen + aantal):
+        if i == opwarmen:
+            voor = (queries.som, queries.aantal)
+        methode, url, body, data = maak()
+        headers = {'Cookie': f'session={sessie(app, data)}'}
+        start = time.perf_counter()
+        response = client.open(url, method=methode, json=body, headers=headers)
+        response.get_data()
+        if i >= opwarmen:
+            tijden.append((time.perf_counter() - start) * 1000)
+            statussen[response.status_code] += 1
+    totaal = sum(tijden)
+    tijden.sort()
+    return {'verzoeken': aantal, 'per_seconde': round(aantal / totaal * 1000, 1), 'gemiddeld_ms': round(totaal / aantal, 2),
+            'p50_ms': round(percentiel(tijden, 50), 2), 'p95_ms': round(percentiel(tijden, 95), 2),
+            'p99_ms': round(percentiel(tijden, 99), 2),
+            'queries': round((queries.som - voor[0]) / max(queries.aantal - voor[1], 1), 1),
+            'status': {str(s): n for s, n in sorted(statussen.items())}}
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repo, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def vergelijk(oud, nieuw):
+    print(f'\n{"route":<22}{"p50 oud":>10}{"p50 nu":>10}{"p95 oud":>10}{"p95 nu":>10}{"req/s":>10}')
+    for naam, result in nieuw['routes'].items():
+        vorig = oud['routes'].get(naam)
+        if vorig is None:
+            continue
+        verschil = (result['per_seconde'] / vorig['per_seconde'] - 1) * 100
+        print(f'{naam:<22}{vorig["p50_ms"]:>10.2f}{result["p50_ms"]:>10.2f}{vorig["p95_ms"]:>10.2f}{result["p95_ms"]:>10.2f}{verschil:>+9.0f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='meet de belangrijkste routes via de flask test client')
+    parser.add_argument('--database', help='een met genereer.py gemaakte database, er wordt een kopie gebruikt')
+    parser.add_argument('--verzoeken', type=int, default=500, help='verzoeken per route')
+    parser.add_argument('--routes', default=','.join(routes))
+    parser.add_argument('--uitvoer')
+    parser.add_argument('--vergelijk')
+    genereer.argumenten(parser)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    pad = os.path.join(tmp, 'hro.sqlite')
+    if args.database:
+        shutil.copy(args.database, pad)
+        conn = sqlite3.connect(pad)
+        schaal = {'database': os.path.basename(args.database)}
+        schaal.update((tabel, conn.execute(f'SELECT COUNT(*) FROM {tabel}').fetchone()[0])
+                      for tabel in ('student', 'klas', 'les', 'les_inschrijving'))
+        conn.close()
+    else:
+        print('database genereren...')
+        schaal = genereer.genereer(pad, args.studenten, args.klassen, args.inschrijvingen, args.docenten, args.vakken, args.seed)
+    rng = random.Random(args.seed)
+    data = steekproef(pad, rng)
+
+    from main import create_app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + pad, 'LOG_NIVEAU': 'WARNING', 'METRICS_TRAAG_MS': 0, 'RATE_LIMIET': False})
+    client = app.test_client(use_cookies=False)
+    maak = verzoeken(data, rng, app.config['SECRET_KEY'])
+
+    resultaat = {'tijdstip': datetime.now().isoformat(timespec='seconds'), 'commit': commit(), 'python': platform.python_version(),
+                 'platform': platform.platform(), 'cores': os.cpu_count(), 'schaal': schaal, 'routes': {}}
+    print(f'{args.verzoeken} verzoeken per route, {os.cpu_count()} cores')
+    print(f'{"route":<22}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"queries":>9}  status')
+    for naam in args.routes.split(','):
+        result = meet(app, client, naam, maak[naam], args.verzoeken)
+        resultaat['routes'][naam] = result
+        print(f'{naam:<22}{result["per_seconde"]:>10.1f}{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}{result["queries"]:>9}  {result["status"]}')
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.uitvoer:
+        with open(args.uitvoer, 'w') as f:
+            json.dump(resultaat, f, indent=2)
+    if args.vergelijk:
+        with open(args.vergelijk) as f:
+            vergelijk(json.load(f), resultaat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# many teacher screens polling the roster of one lesson at the same moment, without an etag (right after a change),
+# with and without request coalescing: requests/s, latency and sql queries per request
+# usage: python benchmarks/bench_samenvoegen.py [database van genereer.py] [schermen] [verzoeken per scherm]
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+import genereer
+
+
+def meet(app, les_id, schermen, verzoeken):
+    queries = app.extensions['hro']['metingen'].queries['hro.lesaanwezigheid']
+    voor = (queries.som, queries.aantal)
+    tijden = []
+    start_signaal = threading.Barrier(schermen)
+
+    def scherm(i):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user'] = str(901 + i)
+            session['rights'] = True
+        start_signaal.wait()
+        for _ in range(verzoeken):
+            start = time.perf_counter()
+            client.get(f'/les/{les_id}/getaanwezigheid').get_data()
+            tijden.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=scherm, args=(i,)) for i in range(schermen)]
+    totaal = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    totaal = time.perf_counter() - totaal
+    tijden.sort()
+    return (len(tijden) / totaal, statistics.median(tijden), tijden[int(len(tijden) * 0.99) - 1],
+            (queries.som - voor[0]) / (queries.aantal - voor[1]))
+
+
+def main(database, schermen, verzoeken):
+    tmp = tempfile.mkdtemp()
+    pad = os.path.join(tmp, 'hro.sqlite')
+    if database:
+        shutil.copy(database, pad)
+    else:
+        genereer.genereer(pad, studenten=5000, klassen=200, inschrijvingen=200000)
+    conn = sqlite3.connect(pad)
+    les_id, aantal = conn.execute('SELECT les_id, COUNT(*) FROM les_inschrijving GROUP BY les_id ORDER BY 2 DESC LIMIT 1').fetchone()
+    conn.close()
+
+    from main import create_app
+    print(f'{schermen} schermen x {verzoeken} verzoeken, les met {aantal} studenten, {os.cpu_count()} cores')
+    print(f'{"":<16}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"queries":>9}')
+    for naam, samenvoegen in (('los', False), ('samengevoegd', True)):
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + pad, 'LOG_NIVEAU': 'WARNING', 'METRICS_TRAAG_MS': 0, 'RATE_LIMIET': False,
+                          'SAMENVOEGEN': samenvoegen, 'TAKEN_PAD': os.path.join(tmp, 'taken.sqlite')})
+        per_seconde, p50, p99, per_verzoek = meet(app, les_id, schermen, verzoeken)
+        print(f'{naam:<16}{per_seconde:>10.0f}{p50:>10.2f}{p99:>10.2f}{per_verzoek:>9.1f}')
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != '-' else None,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 16, int(sys.argv[3]) if len(sys.argv) > 3 else 50)
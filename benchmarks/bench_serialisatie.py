@@ -0,0 +1,86 @@
+# one 10k-row json response built the old way (ORM objects with marshmallow or per-row dicts, flask's json module)
+# and the new way (only the needed columns as tuples, serialisatie.rijen and orjson), median of a number of runs
+# usage: python benchmarks/bench_serialisatie.py [aantal rijen] [herhalingen]
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+from flask.json.provider import DefaultJSONProvider
+
+import genereer
+
+
+def studenten_oud(n):
+    from models import Student, student_schema
+    return student_schema.dump(Student.query.order_by(Student.studentnummer).limit(n).all())
+
+
+def studenten_nieuw(n):
+    from models import db, Student
+    from serialisatie import rijen
+    query = db.select(Student.studentnummer, Student.naam).order_by(Student.studentnummer).limit(n)
+    return rijen(('studentnummer', 'naam'), db.session.execute(query))
+
+
+def lessen_oud(n):
+    from models import db, Les, Vak, LesInschrijving
+    query = (db.select(LesInschrijving, Les, Vak).join(Les, Les.les_id == LesInschrijving.les_id)
+             .join(Vak, Vak.vak_id == Les.vak_id).order_by(LesInschrijving.id).limit(n))
+    return [{"id": i.id, "studentnummer": i.studentnummer, "docent_id": i.docent_id, "les_id": i.les_id,
+             "aanwezigheid": i.aanwezigheid_check, "afwezigheid_reden": i.afwezigheid_rede, "vak_id": les.vak_id,
+             "datum": les.datum, "vak": vak.vak} for i, les, vak in db.session.execute(query)]
+
+
+def lessen_nieuw(n):
+    from models import db, Les, Vak, LesInschrijving
+    from serialisatie import rijen
+    query = (db.select(LesInschrijving.id, LesInschrijving.studentnummer, LesInschrijving.docent_id, LesInschrijving.les_id,
+                       LesInschrijving.aanwezigheid_check, LesInschrijving.afwezigheid_rede, Les.vak_id, Les.datum, Vak.vak)
+             .join(Les, Les.les_id == LesInschrijving.les_id).join(Vak, Vak.vak_id == Les.vak_id)
+             .order_by(LesInschrijving.id).limit(n))
+    return rijen(("id", "studentnummer", "docent_id", "les_id", "aanwezigheid", "afwezigheid_reden", "vak_id", "datum", "vak"),
+                 db.session.execute(query))
+
+
+# (ms for the query and the python data, ms to encode it, bytes)
+def meet(app, provider, laad, n, herhalingen):
+    from models import db
+    laden = []
+    encoderen = []
+    for _ in range(herhalingen):
+        db.session.remove()
+        start = time.perf_counter()
+        data = laad(n)
+        midden = time.perf_counter()
+        body = provider.response(data).get_data()
+        laden.append((midden - start) * 1000)
+        encoderen.append((time.perf_counter() - midden) * 1000)
+    return statistics.median(laden), statistics.median(encoderen), len(body)
+
+
+def main(n, herhalingen):
+    tmp = tempfile.mkdtemp()
+    pad = os.path.join(tmp, 'hro.sqlite')
+    genereer.genereer(pad, studenten=n + 1000, klassen=max(n // 25, 1), inschrijvingen=n * 2)
+    from main import create_app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + pad, 'LOG_NIVEAU': 'WARNING'})
+    oud = DefaultJSONProvider(app)
+
+    print(f'{n} rijen per response, mediaan van {herhalingen} keer')
+    print(f'{"response":<28}{"laden ms":>10}{"json ms":>10}{"totaal ms":>11}{"kB":>8}')
+    with app.test_request_context():
+        for naam, laad, provider in (('studenten marshmallow', studenten_oud, oud), ('studenten kolommen', studenten_nieuw, app.json),
+                                     ('lessen ORM dicts', lessen_oud, oud), ('lessen kolommen', lessen_nieuw, app.json)):
+            laden, encoderen, grootte = meet(app, provider, laad, n, herhalingen)
+            print(f'{naam:<28}{laden:>10.1f}{encoderen:>10.1f}{laden + encoderen:>11.1f}{grootte / 1024:>8.0f}')
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,85 @@
+# logins/s per password hashing setting, simultaneous logins over a real threaded server
+# usage: python benchmarks/bench_wachtwoord.py [aantal logins] [hash workers]
+import http.client
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from werkzeug.serving import BaseWSGIServer, make_server
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+import wachtwoord
+
+instellingen = [('pbkdf2', 260000), ('pbkdf2', 600000), ('scrypt', 14), ('scrypt', 15), ('bcrypt', 10), ('bcrypt', 12)]
+
+
+# copy of hro.sqlite with aantal accounts that all have the same password hash
+def maak_database(tmp, aantal, hash):
+    shutil.copy(os.path.join(repo, 'hro.sqlite'), os.path.join(tmp, 'hro.sqlite'))
+    conn = sqlite3.connect(os.path.join(tmp, 'hro.sqlite'))
+    studenten = list(range(700000, 700000 + aantal))
+    conn.executemany('INSERT INTO student VALUES (?, ?)', ((nr, f'Login student {nr}') for nr in studenten))
+    conn.executemany("INSERT INTO gebruikers (username, password, rights) VALUES (?, ?, 'False')", ((str(nr), hash) for nr in studenten))
+    conn.commit()
+    conn.close()
+    return studenten
+
+
+def meet(methode, kosten, aantal, workers):
+    start = time.perf_counter()
+    hash = wachtwoord.maak_hash('wachtwoord1234', methode, kosten)
+    enkel = time.perf_counter() - start
+
+    tmp = tempfile.mkdtemp()
+    studenten = maak_database(tmp, aantal, hash)
+    from main import create_app
+    # every login waits for its turn, this measures the hashing and not the 503s of a full queue
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'hro.sqlite'), 'WTF_CSRF_ENABLED': False,
+                      'WACHTWOORD_METHODE': methode, 'WACHTWOORD_KOSTEN': kosten, 'WACHTWOORD_WORKERS': workers,
+                      'WACHTWOORD_WACHTRIJ': aantal, 'WACHTWOORD_TIMEOUT': 120})
+    BaseWSGIServer.request_queue_size = aantal
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    start_signaal = threading.Event()
+
+    def login(studentnummer):
+        body = urlencode({'username': str(studentnummer), 'password': 'wachtwoord1234'})
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=120)
+        start_signaal.wait()
+        start = time.perf_counter()
+        conn.request('POST', '/login', body, {'Content-Type': 'application/x-www-form-urlencoded'})
+        status = conn.getresponse().status
+        conn.close()
+        return status, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=aantal) as pool:
+        futures = [pool.submit(login, nr) for nr in studenten]
+        time.sleep(0.5)
+        totaal = time.perf_counter()
+        start_signaal.set()
+        resultaten = [f.result() for f in futures]
+        totaal = time.perf_counter() - totaal
+    server.shutdown()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    tijden = sorted(t * 1000 for status, t in resultaten if status == 302)
+    fouten = sum(1 for status, t in resultaten if status != 302)
+    print(f'{methode} {kosten}: één hash {enkel * 1000:.0f} ms, {len(tijden) / totaal:.1f} logins/s, '
+          f'p50 {statistics.median(tijden):.0f} ms, p99 {tijden[int(len(tijden) * 0.99) - 1]:.0f} ms, {fouten} fouten')
+
+
+if __name__ == '__main__':
+    aantal = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    print(f'{aantal} gelijktijdige logins, {workers} hash workers, {os.cpu_count()} cores')
+    for methode, kosten in instellingen:
+        meet(methode, kosten, aantal, workers)
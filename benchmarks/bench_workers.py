@@ -0,0 +1,111 @@
+# requests/s of the check-in and polling endpoints under gunicorn with a growing number of worker processes
+# usage: python benchmarks/bench_workers.py [workers, comma separated] [seconds per run] [concurrent clients]
+import http.client
+import json
+import os
+import secrets
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+import checkintoken
+from load_checkin import maak_database
+
+
+def vrije_poort():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(tmp, poort, workers):
+    env = dict(os.environ, HRO_WORKERS=str(workers), HRO_BIND=f'127.0.0.1:{poort}')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', os.path.join(repo, 'gunicorn.conf.py'),
+                               '--pythonpath', repo, 'wsgi:app'], cwd=tmp, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', poort), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError('gunicorn start niet')
+
+
+# every client keeps one connection open and sends requests until the time is up
+def belast(poort, verzoeken, duur, clients):
+    stop = time.perf_counter() + duur
+
+    def client(i):
+        conn = http.client.HTTPConnection('127.0.0.1', poort, timeout=30)
+        tijden = []
+        n = i
+        while time.perf_counter() < stop:
+            methode, pad, body, headers = verzoeken(n)
+            n += clients
+            start = time.perf_counter()
+            conn.request(methode, pad, body, headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status == 200:
+                tijden.append(time.perf_counter() - start)
+        conn.close()
+        return tijden
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        tijden = sorted(t * 1000 for deel in pool.map(client, range(clients)) for t in deel)
+    return len(tijden) / duur, statistics.median(tijden), tijden[int(len(tijden) * 0.99) - 1]
+
+
+def main(workers, duur, clients):
+    tmp = tempfile.mkdtemp()
+    les_id, studenten = maak_database(tmp, 500)
+    # the gunicorn workers use the same database and job file, and see the sessions made here
+    os.environ['HRO_DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'hro.sqlite')
+    os.environ['HRO_TAKEN_PAD'] = os.path.join(tmp, 'taken.sqlite')
+    os.environ['HRO_SESSIE_OPSLAG'] = 'sqlite'
+    os.environ['HRO_SESSIE_PAD'] = os.path.join(tmp, 'sessies.sqlite')
+    os.environ['HRO_SECRET_KEY'] = secrets.token_hex(32)
+    # one client hammers the routes as fast as it can, the rate limits would answer most of it with 429
+    os.environ['HRO_RATE_LIMIET'] = '0'
+    from main import create_app
+    app = create_app()
+    sessie = app.session_interface.maak
+    docent = {'Cookie': f"session={sessie(app, {'user': '901', 'rights': True})}"}
+    cookies = [f"session={sessie(app, {'user': str(nr), 'rights': False})}" for nr in studenten]
+
+    def checkin(n):
+        nr = studenten[n % len(studenten)]
+        token = checkintoken.student_token(app.config['SECRET_KEY'], les_id, str(nr))
+        body = json.dumps({'studentnummer': str(nr), 'motivatie': n % 10, 'token': token})
+        return 'POST', f'/{les_id}/aanwezig', body, {'Content-Type': 'application/json', 'Cookie': cookies[n % len(studenten)]}
+
+    def polling(n):
+        return 'GET', f'/les/{les_id}/getaanwezigheid', None, docent
+
+    print(f'{os.cpu_count()} cores, {clients} clients, {duur} s per meting')
+    for aantal in workers:
+        poort = vrije_poort()
+        server = start_server(tmp, poort, aantal)
+        try:
+            for naam, verzoeken in (('check-in', checkin), ('polling', polling)):
+                per_seconde, p50, p99 = belast(poort, verzoeken, duur, clients)
+                print(f'{aantal} workers {naam}: {per_seconde:.0f} requests/s, p50 {p50:.1f} ms, p99 {p99:.1f} ms')
+        finally:
+            server.terminate()
+            server.wait()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main([int(w) for w in (sys.argv[1] if len(sys.argv) > 1 else '1,2,4').split(',')],
+         float(sys.argv[2]) if len(sys.argv) > 2 else 10, int(sys.argv[3]) if len(sys.argv) > 3 else 32)
@@ -0,0 +1,115 @@
+# synthetic data on top of a copy of hro.sqlite: students in classes, lessons per class with every member enrolled
+# the same seed gives the same database, so runs on different commits can be compared
+# usage: python benchmarks/genereer.py doel.sqlite [--studenten 50000] [--klassen 2000] [--inschrijvingen 1000000] [--seed 1]
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+# numbers above the ones in hro.sqlite
+eerste_student = 1000000
+eerste_docent = 10000
+eerste_vak = 100
+# lessons run from this many days ago until a week from now, the ones before today are closed
+dagen = 180
+
+
+def argumenten(parser):
+    parser.add_argument('--studenten', type=int, default=50000)
+    parser.add_argument('--klassen', type=int, default=2000)
+    parser.add_argument('--inschrijvingen', type=int, default=1000000, help='les_inschrijving rijen')
+    parser.add_argument('--docenten', type=int, default=200)
+    parser.add_argument('--vakken', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+
+
+def klascode(k):
+    return f'S{k:05d}'
+
+
+# attendance of a lesson that already took place: mostly present, some signed off, some never responded
+def aanwezigheid(rng, voorbij):
+    if not voorbij:
+        return 0, None, None
+    kans = rng.random()
+    if kans < 0.8:
+        return 1, None, rng.randint(1, 10)
+    if kans < 0.9:
+        return 2, 'ziek', None
+    return 0, None, None
+
+
+def genereer(pad, studenten=50000, klassen=2000, inschrijvingen=1000000, docenten=200, vakken=20, seed=1):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    shutil.copy(os.path.join(repo, 'hro.sqlite'), pad)
+    conn = sqlite3.connect(pad)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+
+    nummers = range(eerste_student, eerste_student + studenten)
+    conn.executemany('INSERT INTO student VALUES (?, ?)', ((nr, f'Student {nr}') for nr in nummers))
+    conn.executemany('INSERT INTO docent VALUES (?, ?)', ((eerste_docent + d, f'Docent {d}') for d in range(docenten)))
+    conn.executemany('INSERT INTO vak VALUES (?, ?)', ((eerste_vak + v, f'Vak {v}') for v in range(vakken)))
+    conn.executemany('INSERT INTO klas VALUES (?, ?)', ((klascode(k), f'Docent {k % docenten}') for k in range(klassen)))
+    # every student in one class, round robin
+    leden = [[] for _ in range(klassen)]
+    for i, nr in enumerate(nummers):
+        leden[i % klassen].append(nr)
+    conn.executemany('INSERT INTO klas_inschrijving (studentnummer, klascode) VALUES (?, ?)',
+                     ((nr, klascode(k)) for k in range(klassen) for nr in leden[k]))
+
+    # lessons go round the classes until there are enough enrollments
+    vandaag = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    lessen = []
+
+    def rijen():
+        totaal = 0
+        k = 0
+        while totaal < inschrijvingen:
+            klas = leden[k % klassen]
+            k += 1
+            if not klas:
+                continue
+            les_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            datum = vandaag + timedelta(days=rng.randint(-dagen, 7), hours=rng.randint(8, 17))
+            voorbij = datum < vandaag
+            lessen.append((les_id, eerste_vak + rng.randrange(vakken), datum.strftime('%Y-%m-%d %H:%M:%S'),
+                           'closed' if voorbij else 'opened'))
+            docent = eerste_docent + (k % docenten)
+            for nr in klas[:inschrijvingen - totaal]:
+                yield (nr, docent, les_id) + aanwezigheid(rng, voorbij)
+            totaal += len(klas)
+
+    conn.executemany('INSERT INTO les_inschrijving (studentnummer, docent_id, les_id, aanwezigheid_check, afwezigheid_rede, motivatie) '
+                     'VALUES (?, ?, ?, ?, ?, ?)', rijen())
+    conn.executemany('INSERT INTO les VALUES (?, ?, ?, ?)', lessen)
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+
+    # the rollup tables have to match the enrollments, like after statistiek-herbouw
+    from main import create_app
+    import statistiek
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(pad), 'LOG_NIVEAU': 'WARNING'})
+    with app.app_context():
+        statistiek.herbouw()
+    return {'studenten': studenten, 'klassen': klassen, 'inschrijvingen': inschrijvingen, 'lessen': len(lessen),
+            'docenten': docenten, 'vakken': vakken, 'seed': seed, 'seconden': round(time.perf_counter() - start, 1)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='vult een kopie van hro.sqlite met synthetische data')
+    parser.add_argument('doel')
+    argumenten(parser)
+    args = parser.parse_args()
+    schaal = genereer(args.doel, args.studenten, args.klassen, args.inschrijvingen, args.docenten, args.vakken, args.seed)
+    print(', '.join(f'{naam} {waarde}' for naam, waarde in schaal.items()))
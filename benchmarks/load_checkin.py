@@ -0,0 +1,87 @@
+# load test: simultaneous check-ins against one lesson over a real threaded server
+# usage: python benchmarks/load_checkin.py [aantal studenten] [batch ms]
+import http.client
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, make_server
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+import checkintoken
+
+
+# copy of hro.sqlite with one open lesson and its students
+def maak_database(tmp, aantal):
+    shutil.copy(os.path.join(repo, 'hro.sqlite'), os.path.join(tmp, 'hro.sqlite'))
+    conn = sqlite3.connect(os.path.join(tmp, 'hro.sqlite'))
+    les_id = str(uuid.uuid4())
+    studenten = list(range(500000, 500000 + aantal))
+    conn.executemany('INSERT INTO student VALUES (?, ?)', ((nr, f'Load student {nr}') for nr in studenten))
+    conn.execute("INSERT INTO les VALUES (?, 1, '2023-09-01 09:00:00', 'opened')", (les_id,))
+    conn.executemany("INSERT INTO les_inschrijving (studentnummer, docent_id, les_id, aanwezigheid_check) VALUES (?, 901, ?, 0)",
+                     ((nr, les_id) for nr in studenten))
+    conn.commit()
+    conn.close()
+    return les_id, studenten
+
+
+def main(aantal, batch_ms):
+    tmp = tempfile.mkdtemp()
+    les_id, studenten = maak_database(tmp, aantal)
+    from main import create_app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'hro.sqlite'),
+                      'TAKEN_PAD': os.path.join(tmp, 'taken.sqlite'), 'CHECKIN_BATCH_MS': batch_ms})
+
+    # listen backlog large enough for every student connecting at once
+    BaseWSGIServer.request_queue_size = aantal
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    poort = server.server_port
+
+    start_signaal = threading.Event()
+
+    def checkin(studentnummer):
+        cookie = app.session_interface.maak(app, {'user': str(studentnummer), 'rights': False})
+        token = checkintoken.student_token(app.config['SECRET_KEY'], les_id, str(studentnummer))
+        body = json.dumps({'studentnummer': str(studentnummer), 'motivatie': 7, 'token': token})
+        conn = http.client.HTTPConnection('127.0.0.1', poort, timeout=60)
+        start_signaal.wait()
+        start = time.perf_counter()
+        conn.request('POST', f'/{les_id}/aanwezig', body, {'Content-Type': 'application/json', 'Cookie': f'session={cookie}'})
+        status = conn.getresponse().status
+        conn.close()
+        return status, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=aantal) as pool:
+        futures = [pool.submit(checkin, nr) for nr in studenten]
+        time.sleep(0.5)
+        totaal = time.perf_counter()
+        start_signaal.set()
+        resultaten = [f.result() for f in futures]
+        totaal = time.perf_counter() - totaal
+    server.shutdown()
+
+    tijden = sorted(t * 1000 for status, t in resultaten)
+    fouten = sum(1 for status, t in resultaten if status != 200)
+    aanwezig = sqlite3.connect(os.path.join(tmp, 'hro.sqlite')).execute(
+        'SELECT COUNT(*) FROM les_inschrijving WHERE les_id = ? AND aanwezigheid_check = 1', (les_id,)).fetchone()[0]
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f'{aantal} gelijktijdige check-ins, batch {batch_ms} ms')
+    print(f'p50 {statistics.median(tijden):.1f} ms, p99 {tijden[int(len(tijden) * 0.99) - 1]:.1f} ms, max {tijden[-1]:.1f} ms')
+    print(f'{aantal / totaal:.0f} check-ins/s, {fouten} fouten, {aanwezig} aanwezig in database')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500, int(sys.argv[2]) if len(sys.argv) > 2 else 0)
@@ -0,0 +1,59 @@
+# in-process cache for reference data that rarely changes (students, classes, subjects, teachers)
+import hashlib
+import json
+import threading
+import time
+
+
+class ReferentieCache:
+    # versie is an optional callable returning a counter that other processes bump when they write,
+    # it is checked at most every controle seconds and a new value empties the cache
+    def __init__(self, ttl=300, versie=None, controle=1):
+        self.ttl = ttl
+        self.versie = versie
+        self.controle = controle
+        self.gecontroleerd = 0
+        self.gezien = None
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.generatie = 0
+
+    # cached value for key, the loader runs when it is missing or expired
+    def get(self, key, loader):
+        return self.entry(key, loader)[0]
+
+    # (value, etag) for key, the etag only changes when the value does
+    def entry(self, key, loader):
+        now = time.monotonic()
+        if self.versie is not None and now - self.gecontroleerd >= self.controle:
+            self.controleer(now)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] > now:
+                return entry[0], entry[1]
+            generatie = self.generatie
+        value = loader()
+        etag = hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+        with self.lock:
+            # an invalidate while loading means the value may already be stale
+            if generatie == self.generatie:
+                self.entries[key] = (value, etag, now + self.ttl)
+        return value, etag
+
+    # drops the given keys, or everything when no key is given
+    def invalidate(self, *keys):
+        with self.lock:
+            self.generatie += 1
+            if not keys:
+                self.entries.clear()
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def controleer(self, now):
+        versie = self.versie()
+        with self.lock:
+            self.gecontroleerd = now
+            if versie != self.gezien:
+                self.gezien = versie
+                self.generatie += 1
+                self.entries.clear()
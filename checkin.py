@@ -0,0 +1,82 @@
+# check-in writes: one UPDATE per submission, optionally grouped into micro-batched commits
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import event, select, update
+
+from models import Les, LesInschrijving
+import versies
+
+
+# WAL lets check-ins write while the screens keep reading, busy_timeout waits instead of failing with "database is locked"
+def sqlite_pragmas(engine, busy_timeout=5000):
+    @event.listens_for(engine, 'connect')
+    def connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode = WAL')
+        cursor.execute('PRAGMA synchronous = NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout = {int(busy_timeout)}')
+        cursor.close()
+
+
+# single UPDATE without reading the row first, returns the number of changed rows
+# closed lessons are skipped, changes there also have to update the statistics
+def update_inschrijving(conn, les_id, studentnummer, waarden):
+    open_les = select(Les.les_id).where(Les.les_id == str(les_id), Les.entry != 'closed').exists()
+    stmt = (update(LesInschrijving.__table__)
+            .where(LesInschrijving.les_id == str(les_id), LesInschrijving.studentnummer == int(studentnummer), open_les)
+            .values(**waarden))
+    return conn.execute(stmt).rowcount
+
+
+# change counters of a written check-in, bumped in the same transaction as the UPDATE
+def checkin_sleutels(les_id, studentnummer):
+    return f'les:{les_id}', f'student:{studentnummer}'
+
+
+# collects check-ins for a few milliseconds and writes them in one transaction
+class CheckinBatcher:
+    def __init__(self, engine, wacht_ms=5, max_batch=200):
+        self.engine = engine
+        self.wacht = wacht_ms / 1000
+        self.max_batch = max_batch
+        self.wachtrij = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # blocks until the batch holding this check-in is committed, returns the changed row count
+    def submit(self, les_id, studentnummer, waarden, timeout=30):
+        future = Future()
+        self.wachtrij.put((les_id, studentnummer, waarden, future))
+        return future.result(timeout)
+
+    def run(self):
+        while True:
+            batch = [self.wachtrij.get()]
+            # the first check-in waits at most wacht_ms for others to join its batch
+            deadline = time.monotonic() + self.wacht
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self.wachtrij.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                pass
+            self.schrijf(batch)
+
+    def schrijf(self, batch):
+        try:
+            with self.engine.begin() as conn:
+                resultaten = [update_inschrijving(conn, les_id, studentnummer, waarden) for les_id, studentnummer, waarden, future in batch]
+                versies.verhoog(*(sleutel for item, rowcount in zip(batch, resultaten) if rowcount
+                                  for sleutel in checkin_sleutels(item[0], item[1])), conn=conn)
+        except Exception as e:
+            # one bad check-in should not fail the others, retry them one by one
+            if len(batch) > 1:
+                for item in batch:
+                    self.schrijf([item])
+            else:
+                batch[0][3].set_exception(e)
+            return
+        for item, rowcount in zip(batch, resultaten):
+            item[3].set_result(rowcount)
@@ -0,0 +1,79 @@
+# signed check-in tokens, checked with an hmac over SECRET_KEY without reading the database
+# the qr on the teacher screen holds a lesson token that changes every window, a scan with a valid one gets the check-in
+# form with a token for that student, which can be used once; a shared photo of the qr is useless after a few minutes
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+def handtekening(geheim, tekst):
+    return hmac.new(geheim.encode(), f'checkin:{tekst}'.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def nu_of(nu):
+    return time.time() if nu is None else nu
+
+
+# qr token of a lesson: <window>.<hmac over the lesson and the window>, a new one every periode seconds
+def les_token(geheim, les_id, periode, nu=None):
+    venster = int(nu_of(nu) // periode)
+    return f'{venster}.{handtekening(geheim, f"les:{les_id}:{venster}")}'
+
+
+# a qr token is accepted until geldig seconds after its window started, long enough to log in first
+def les_geldig(geheim, les_id, token, periode, geldig, nu=None):
+    venster, _, teken = (token or '').partition('.')
+    if not venster.isdigit():
+        return False
+    leeftijd = nu_of(nu) - int(venster) * periode
+    if not 0 <= leeftijd < max(geldig, periode):
+        return False
+    return hmac.compare_digest(teken, handtekening(geheim, f'les:{les_id}:{venster}'))
+
+
+# form token of one student: <time>.<random>.<hmac over lesson, student, time and random>
+def student_token(geheim, les_id, studentnummer, nu=None):
+    tijd = int(nu_of(nu))
+    nonce = secrets.token_hex(6)
+    return f'{tijd}.{nonce}.{handtekening(geheim, f"student:{les_id}:{studentnummer}:{tijd}:{nonce}")}'
+
+
+# the moment a form token expires, None when it is forged, for another lesson or student, or older than geldig seconds
+def student_verloopt(geheim, les_id, studentnummer, token, geldig, nu=None):
+    delen = (token or '').split('.')
+    if len(delen) != 3 or not delen[0].isdigit():
+        return None
+    tijd, nonce, teken = delen
+    if not 0 <= nu_of(nu) - int(tijd) < geldig:
+        return None
+    if not hmac.compare_digest(teken, handtekening(geheim, f'student:{les_id}:{studentnummer}:{tijd}:{nonce}')):
+        return None
+    return int(tijd) + geldig
+
+
+class Gebruikt:
+    # form tokens used in this process, kept until they expire since an expired token is refused anyway,
+    # at most maxsize, the oldest go first; a token used once on another worker can only check in the same student again
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.tokens = OrderedDict()
+
+    # True the first time a token is seen, False for a replay
+    def eerste_keer(self, token, verloopt, nu=None):
+        nu = nu_of(nu)
+        with self.lock:
+            while self.tokens:
+                oudste = next(iter(self.tokens))
+                if self.tokens[oudste] > nu:
+                    break
+                del self.tokens[oudste]
+            if token in self.tokens:
+                return False
+            self.tokens[token] = verloopt
+            while len(self.tokens) > self.maxsize:
+                self.tokens.popitem(last=False)
+        return True
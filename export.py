@@ -0,0 +1,76 @@
+# streaming attendance export, rows come from the cursor in chunks so memory stays flat
+import csv
+import io
+import json
+
+from models import db, Student, Docent, Vak, Les, KlasInschrijving, LesInschrijving
+
+kolommen = ['datum', 'vak', 'docent', 'studentnummer', 'naam', 'aanwezigheid', 'afwezigheid_reden', 'motivatie']
+chunk = 2000
+
+
+def query(klascode=None, vak=None, docent_id=None, van=None, tot=None):
+    query = (db.select(Les.datum, Vak.vak, Docent.naam.label('docent'), LesInschrijving.studentnummer, Student.naam,
+                       LesInschrijving.aanwezigheid_check, LesInschrijving.afwezigheid_rede, LesInschrijving.motivatie)
+             .select_from(LesInschrijving)
+             .join(Les, Les.les_id == LesInschrijving.les_id)
+             .join(Vak, Vak.vak_id == Les.vak_id)
+             .join(Docent, Docent.docent_id == LesInschrijving.docent_id)
+             .join(Student, Student.studentnummer == LesInschrijving.studentnummer)
+             .order_by(Les.datum, LesInschrijving.les_id, LesInschrijving.studentnummer))
+    if klascode is not None:
+        leden = db.select(KlasInschrijving.studentnummer).where(KlasInschrijving.klascode == klascode)
+        query = query.where(LesInschrijving.studentnummer.in_(leden))
+    if vak is not None:
+        query = query.where(Vak.vak == vak)
+    if docent_id is not None:
+        query = query.where(LesInschrijving.docent_id == docent_id)
+    if van is not None:
+        query = query.where(Les.datum >= van)
+    if tot is not None:
+        query = query.where(Les.datum < tot)
+    return query
+
+
+# result rows in lists of at most chunk rows, yield_per uses a server-side cursor where the driver has one
+def rijen(query):
+    result = db.session.execute(query, execution_options={'yield_per': chunk})
+    for partitie in result.partitions():
+        yield partitie
+
+
+def csv_stream(query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(kolommen)
+    for partitie in rijen(query):
+        writer.writerows((rij[0].isoformat(sep=' '), *rij[1:]) for rij in partitie)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+# compact columnar format: newline separated json blocks, one array per column,
+# strings that repeat (vak, docent, naam) are sent once and referenced by index afterwards
+def kolom_stream(query):
+    yield json.dumps({'kolommen': kolommen, 'woordenboek': ['vak', 'docent', 'naam']}) + '\n'
+    woordenboeken = {naam: {} for naam in ('vak', 'docent', 'naam')}
+    for partitie in rijen(query):
+        blok = {naam: [] for naam in kolommen}
+        nieuw = {naam: [] for naam in woordenboeken}
+        for rij in partitie:
+            for naam, waarde in zip(kolommen, rij):
+                if naam in woordenboeken:
+                    woordenboek = woordenboeken[naam]
+                    if waarde not in woordenboek:
+                        woordenboek[waarde] = len(woordenboek)
+                        nieuw[naam].append(waarde)
+                    waarde = woordenboek[waarde]
+                elif naam == 'datum':
+                    waarde = waarde.isoformat(sep=' ')
+                blok[naam].append(waarde)
+        yield json.dumps({'nieuw': nieuw, 'rijen': len(partitie), 'blok': blok}, separators=(',', ':')) + '\n'
+
+
+formaten = {'csv': (csv_stream, 'text/csv'), 'kolom': (kolom_stream, 'application/x-ndjson')}
@@ -0,0 +1,144 @@
+# in-process publish/subscribe feed for attendance changes per lesson
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+
+import serialisatie
+
+
+class AanwezigheidFeed:
+    # backlog events per lesson, maxsize lessons, the ones published to least recently are dropped first
+    # unless a screen is still listening to them; every stream holds a request thread, so at most max_streams at once
+    def __init__(self, backlog=500, maxsize=1000, max_streams=4):
+        self.backlog = backlog
+        self.maxsize = maxsize
+        self.max_streams = max_streams
+        self.condition = threading.Condition()
+        self.versions = OrderedDict()
+        self.events = {}
+        self.luisteraars = Counter()
+        # event ids carry this so a cursor from another process or an earlier run is not mistaken for ours
+        self.id = uuid.uuid4().hex[:8]
+
+    # version of a lesson, every published change bumps it by one
+    def version(self, les_id):
+        with self.condition:
+            return self.versions.get(str(les_id), 0)
+
+    # store a change for a lesson and wake up every waiting screen
+    def publish(self, les_id, event):
+        les_id = str(les_id)
+        with self.condition:
+            version = self.versions.get(les_id, 0) + 1
+            self.versions[les_id] = version
+            if les_id not in self.events:
+                self.events[les_id] = deque(maxlen=self.backlog)
+            self.events[les_id].append((version, event))
+            self.versions.move_to_end(les_id)
+            self.opruimen()
+            self.condition.notify_all()
+        return version
+
+    # called with the condition held
+    def opruimen(self):
+        for les_id in list(self.versions):
+            if len(self.versions) <= self.maxsize:
+                break
+            if not self.luisteraars[les_id]:
+                del self.versions[les_id]
+                del self.events[les_id]
+                del self.luisteraars[les_id]
+
+    def event_id(self, version):
+        return f"{self.id}.{version}"
+
+    # version from an event id of this feed, None for anything else
+    def cursor(self, event_id):
+        feed, _, version = str(event_id).partition(".")
+        if feed != self.id or not version.isdigit():
+            return None
+        return int(version)
+
+    # changes after cursor, None when the cursor is too old and the screen has to reload,
+    # or newer than what is known because the lesson was dropped in the meantime
+    def since(self, les_id, cursor):
+        les_id = str(les_id)
+        with self.condition:
+            version = self.versions.get(les_id, 0)
+            events = self.events.get(les_id, ())
+            if cursor > version:
+                return None
+            if cursor == version:
+                return []
+            if cursor < version - len(events):
+                return None
+            return [(v, e) for v, e in events if v > cursor]
+
+    # block until there is something newer than cursor or the timeout passes
+    def wait(self, les_id, cursor, timeout=15):
+        les_id = str(les_id)
+        with self.condition:
+            self.condition.wait_for(lambda: self.versions.get(les_id, 0) > cursor, timeout)
+        return self.since(les_id, cursor)
+
+    # a place for one more stream on a lesson, False when max_streams are open already
+    def aanmelden(self, les_id):
+        les_id = str(les_id)
+        with self.condition:
+            if sum(self.luisteraars.values()) >= self.max_streams:
+                return False
+            self.luisteraars[les_id] += 1
+            return True
+
+    # called when the stream response is closed
+    def afmelden(self, les_id):
+        les_id = str(les_id)
+        with self.condition:
+            self.luisteraars[les_id] -= 1
+            if not self.luisteraars[les_id]:
+                del self.luisteraars[les_id]
+
+    # server-sent events for one screen, starting after cursor, ending after duur seconds so the thread is given back;
+    # the browser reconnects after retry milliseconds with the last event id
+    # extern is a (version, roster) pair of callables for changes written by other processes,
+    # when its version moves without a local event the screen gets a fresh snapshot
+    def stream(self, les_id, cursor, snapshot=None, extern=None, poll=2, ping=15, duur=60, retry=1000):
+        les_id = str(les_id)
+        yield f"retry: {retry}\n\n"
+        if snapshot is not None:
+            yield sse("snapshot", snapshot, self.event_id(cursor))
+        gezien = extern[0]() if extern else None
+        stil = time.monotonic()
+        einde = stil + duur
+        while True:
+            over = einde - time.monotonic()
+            if over <= 0:
+                return
+            events = self.wait(les_id, cursor, min(poll if extern else ping, over))
+            if events is None:
+                yield sse("reload", {}, self.event_id(self.version(les_id)))
+                return
+            if events:
+                for version, event in events:
+                    yield sse("delta", event, self.event_id(version))
+                    cursor = version
+                if extern:
+                    gezien = extern[0]()
+                stil = time.monotonic()
+                continue
+            if extern:
+                versie = extern[0]()
+                if versie != gezien:
+                    gezien = versie
+                    yield sse("snapshot", extern[1](), self.event_id(cursor))
+                    stil = time.monotonic()
+                    continue
+            if time.monotonic() - stil >= ping:
+                # comment line keeps proxies from closing an idle connection
+                yield ": ping\n\n"
+                stil = time.monotonic()
+
+
+def sse(event, data, event_id):
+    return f"id: {event_id}\nevent: {event}\ndata: {serialisatie.dumps(data).decode()}\n\n"
@@ -0,0 +1,25 @@
+# gunicorn settings, each can be overridden with an environment variable
+import multiprocessing
+import os
+
+# tokens signed with the default key from the repository can be forged by anyone
+if not os.environ.get('HRO_SECRET_KEY'):
+    raise SystemExit('zet HRO_SECRET_KEY, bijvoorbeeld op de uitvoer van: python -c "import secrets; print(secrets.token_hex(32))"')
+
+bind = os.environ.get('HRO_BIND', '0.0.0.0:8000')
+# processes, the default follows the number of cores
+workers = int(os.environ.get('HRO_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# threads per process, open teacher screens keep at most half of them busy with event streams (HRO_STREAMS_MAX)
+worker_class = 'gthread'
+threads = int(os.environ.get('HRO_THREADS', 8))
+# the app starts background threads (check-in batcher, qr warming), so it is loaded after the fork
+preload_app = False
+# sessions have to be visible to every worker, so they go in a shared sqlite file unless configured otherwise
+os.environ.setdefault('HRO_SESSIE_OPSLAG', 'sqlite')
+# one json object per log line, for the log collector
+os.environ.setdefault('HRO_LOG_FORMAAT', 'json')
+# event streams stay open, the worker timeout only applies to a blocked process
+timeout = int(os.environ.get('HRO_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+accesslog = os.environ.get('HRO_ACCESSLOG')
@@ -0,0 +1,133 @@
+# iCalendar feeds of the lessons of a student or teacher, calendar apps subscribe with a secret url instead of a login
+# kalender:student:<nr> and kalender:docent:<id> only change when lessons are planned for that user, so a check-in
+# leaves the feed and its etag alone; per user the rendered events stay cached and a new version only fetches new lessons
+import hashlib
+import hmac
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from models import db, Docent, Vak, Les, LesInschrijving
+import versies
+
+soorten = {'s': 'student', 'd': 'docent'}
+
+# dates in the database are local times in the Netherlands
+tijdzone = '\r\n'.join([
+    'BEGIN:VTIMEZONE', 'TZID:Europe/Amsterdam',
+    'BEGIN:DAYLIGHT', 'TZOFFSETFROM:+0100', 'TZOFFSETTO:+0200', 'TZNAME:CEST', 'DTSTART:19700329T020000',
+    'RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU', 'END:DAYLIGHT',
+    'BEGIN:STANDARD', 'TZOFFSETFROM:+0200', 'TZOFFSETTO:+0100', 'TZNAME:CET', 'DTSTART:19701025T030000',
+    'RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU', 'END:STANDARD',
+    'END:VTIMEZONE'])
+
+
+def sleutel(soort, nummer):
+    return f'kalender:{soort}:{nummer}'
+
+
+def handtekening(geheim, code):
+    return hmac.new(geheim.encode(), f'kalender:{code}'.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+# s129.<hmac> for student 129, d901.<hmac> for teacher 901
+def token(geheim, soort, nummer):
+    code = f'{soort[0]}{nummer}'
+    return f'{code}.{handtekening(geheim, code)}'
+
+
+# (soort, nummer) of a valid token, None otherwise
+def lees_token(geheim, token):
+    code, _, teken = token.partition('.')
+    if code[:1] not in soorten or not code[1:].isdigit():
+        return None
+    if not hmac.compare_digest(teken, handtekening(geheim, code)):
+        return None
+    return soorten[code[0]], int(code[1:])
+
+
+# text values escaped and lines folded at 75 characters, as RFC 5545 asks
+def tekst(waarde):
+    return str(waarde).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def vouw(regel):
+    delen = [regel[i:i + 74] for i in range(0, len(regel), 74)]
+    return '\r\n '.join(delen)
+
+
+def tijd(datum):
+    return datum.strftime('%Y%m%dT%H%M%S')
+
+
+def event(rij, minuten, stempel):
+    regels = ['BEGIN:VEVENT', f'UID:{rij.les_id}@hro-aanwezigheid', f'DTSTAMP:{stempel}',
+              f'DTSTART;TZID=Europe/Amsterdam:{tijd(rij.datum)}',
+              f'DTEND;TZID=Europe/Amsterdam:{tijd(rij.datum + timedelta(minutes=minuten))}',
+              f'SUMMARY:{tekst(rij.vak)}', f'DESCRIPTION:{tekst("Docent " + rij.naam)}', 'END:VEVENT']
+    return '\r\n'.join(vouw(regel) for regel in regels)
+
+
+def inschrijvingen(soort, nummer):
+    if soort == 'student':
+        return LesInschrijving.studentnummer == nummer
+    return LesInschrijving.docent_id == nummer
+
+
+# lesson ids of the user, read from the covering (studentnummer, les_id) and (docent_id, les_id) indexes
+def les_ids(soort, nummer):
+    query = db.select(LesInschrijving.les_id).where(inschrijvingen(soort, nummer)).distinct()
+    return set(db.session.execute(query).scalars())
+
+
+def lessen(soort, nummer, ids):
+    ids = sorted(ids)
+    for i in range(0, len(ids), 500):
+        query = (db.select(Les.les_id, Les.datum, Vak.vak, Docent.naam)
+                 .select_from(LesInschrijving)
+                 .join(Les, Les.les_id == LesInschrijving.les_id)
+                 .join(Vak, Vak.vak_id == Les.vak_id)
+                 .join(Docent, Docent.docent_id == LesInschrijving.docent_id)
+                 .where(inschrijvingen(soort, nummer), LesInschrijving.les_id.in_(ids[i:i + 500]))
+                 .distinct())
+        yield from db.session.execute(query)
+
+
+class KalenderCache:
+    # maxsize feeds per process, the least recently used ones are dropped
+    def __init__(self, maxsize=10000, minuten=50, naam='HRO lessen'):
+        self.maxsize = maxsize
+        self.minuten = minuten
+        self.naam = naam
+        self.lock = threading.Lock()
+        self.feeds = OrderedDict()
+
+    # the feed as bytes, only lessons that are new since the cached version are read and rendered
+    def feed(self, soort, nummer):
+        versie = versies.versie(sleutel(soort, nummer))
+        with self.lock:
+            entry = self.feeds.get((soort, nummer))
+            if entry is not None:
+                self.feeds.move_to_end((soort, nummer))
+                if entry[0] == versie:
+                    return entry[2]
+        events = dict(entry[1]) if entry is not None else {}
+        ids = les_ids(soort, nummer)
+        for les_id in events.keys() - ids:
+            del events[les_id]
+        stempel = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        for rij in lessen(soort, nummer, ids - events.keys()):
+            events[rij.les_id] = event(rij, self.minuten, stempel)
+        body = self.kalender(events.values())
+        with self.lock:
+            self.feeds[(soort, nummer)] = (versie, events, body)
+            self.feeds.move_to_end((soort, nummer))
+            while len(self.feeds) > self.maxsize:
+                self.feeds.popitem(last=False)
+        return body
+
+    def kalender(self, events):
+        kop = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//Hogeschool Rotterdam//Aanwezigheid//NL', 'CALSCALE:GREGORIAN',
+               'METHOD:PUBLISH', f'X-WR-CALNAME:{tekst(self.naam)}', 'X-WR-TIMEZONE:Europe/Amsterdam',
+               'REFRESH-INTERVAL;VALUE=DURATION:PT1H', tijdzone]
+        return '\r\n'.join(kop + list(events) + ['END:VCALENDAR', '']).encode()
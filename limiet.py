@@ -0,0 +1,62 @@
+# token buckets per user and route for the check-in and polled routes, and one shared computation for identical
+# polls that arrive together; both live in the process, with several gunicorn workers a user gets the limit per worker
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class Emmers:
+    # regels: endpoint -> (burst, tokens per second), endpoints without a rule are not limited
+    # maxsize buckets are kept, a bucket that is dropped starts full again
+    def __init__(self, regels, maxsize=50000):
+        self.regels = regels
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.emmers = OrderedDict()
+
+    # takes a token from the bucket of this user and endpoint, 0 when the request may go ahead,
+    # otherwise the number of seconds until the next token
+    def neem(self, gebruiker, endpoint):
+        regel = self.regels.get(endpoint)
+        if regel is None:
+            return 0
+        burst, snelheid = regel
+        sleutel = (gebruiker, endpoint)
+        nu = time.monotonic()
+        with self.lock:
+            tokens, tijd = self.emmers.pop(sleutel, (burst, nu))
+            tokens = min(burst, tokens + (nu - tijd) * snelheid)
+            wacht = 0 if tokens >= 1 else (1 - tokens) / snelheid
+            self.emmers[sleutel] = (tokens if wacht else tokens - 1, nu)
+            while len(self.emmers) > self.maxsize:
+                self.emmers.popitem(last=False)
+        return wacht
+
+
+class Samenvoeger:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bezig = {}
+
+    # the result of maak for this key; a request that comes in while another one computes the same key
+    # waits for that result instead of doing the work again, an exception reaches every waiting request
+    def gedeeld(self, sleutel, maak):
+        with self.lock:
+            future = self.bezig.get(sleutel)
+            eerste = future is None
+            if eerste:
+                future = self.bezig[sleutel] = Future()
+        if not eerste:
+            return future.result()
+        try:
+            resultaat = maak()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(resultaat)
+            return resultaat
+        finally:
+            with self.lock:
+                del self.bezig[sleutel]
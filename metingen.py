@@ -0,0 +1,178 @@
+# per request: latency per endpoint, number of sql queries and time spent in sql, read by /metrics in prometheus text format
+# the numbers are per worker process, every series carries the pid in the worker label
+import json
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler, wsgi_errors_stream
+from sqlalchemy import event
+
+latentie_grenzen = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+query_grenzen = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# the same query with other parameters, IN lists of any length count as one
+placeholders = re.compile(r'%\(\w+\)s|\?')
+lijsten = re.compile(r'\(\?(?:, \?)*\)')
+
+
+def normaliseer(statement):
+    return lijsten.sub('(?)', placeholders.sub('?', ' '.join(statement.split())))
+
+
+class Histogram:
+    def __init__(self, grenzen):
+        self.grenzen = grenzen
+        # one bucket per bound and a last one for everything above, cumulative only when written out
+        self.emmers = [0] * (len(grenzen) + 1)
+        self.som = 0
+        self.aantal = 0
+
+    def meet(self, waarde):
+        self.emmers[bisect_left(self.grenzen, waarde)] += 1
+        self.som += waarde
+        self.aantal += 1
+
+
+def labels(**waarden):
+    def escape(waarde):
+        return str(waarde).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{naam}="{escape(waarde)}"' for naam, waarde in waarden.items()) + '}'
+
+
+class Metingen:
+    # n_plus_1: a request running the same query more often than this is reported,
+    # traag_ms: requests slower than this are logged with their query numbers, 0 logs none
+    def __init__(self, logger, n_plus_1=10, traag_ms=1000):
+        self.logger = logger
+        self.n_plus_1 = n_plus_1
+        self.traag_ms = traag_ms
+        self.worker = str(os.getpid())
+        self.lock = threading.Lock()
+        self.verzoeken = Counter()
+        self.latentie = defaultdict(lambda: Histogram(latentie_grenzen))
+        self.queries = defaultdict(lambda: Histogram(query_grenzen))
+        self.sql_tijd = defaultdict(lambda: Histogram(latentie_grenzen))
+        self.herhaald = Counter()
+        self.gemeld = set()
+
+    def koppel(self, app, engine):
+        app.before_request(self.begin)
+        app.after_request(self.na_request)
+        app.teardown_request(self.teardown)
+        event.listen(engine, 'before_cursor_execute', self.voor_query)
+        event.listen(engine, 'after_cursor_execute', self.na_query)
+
+    def begin(self):
+        g.meting = {'start': time.perf_counter(), 'queries': Counter(), 'sql': 0.0}
+
+    # batcher and background threads have no request and are not counted
+    def voor_query(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and g.get('meting') is not None:
+            conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def na_query(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and g.get('meting') is not None and conn.info.get('query_start'):
+            g.meting['sql'] += time.perf_counter() - conn.info['query_start'].pop()
+            g.meting['queries'][normaliseer(statement)] += 1
+
+    def na_request(self, response):
+        self.einde(response.status_code)
+        return response
+
+    # an unhandled exception skips after_request, teardown still runs
+    def teardown(self, fout):
+        if g.get('meting') is not None:
+            self.einde(500)
+
+    # event streams and exports run on after this, their queries are not counted in the request
+    def einde(self, status):
+        meting = g.meting
+        g.meting = None
+        duur = time.perf_counter() - meting['start']
+        endpoint = request.endpoint or 'geen'
+        aantal = sum(meting['queries'].values())
+        herhaald = [(sql, n) for sql, n in meting['queries'].items() if n > self.n_plus_1]
+        with self.lock:
+            self.verzoeken[(endpoint, request.method, status)] += 1
+            self.latentie[(endpoint, request.method)].meet(duur)
+            self.queries[endpoint].meet(aantal)
+            self.sql_tijd[endpoint].meet(meting['sql'])
+            if herhaald:
+                self.herhaald[endpoint] += 1
+            nieuw = []
+            for sql, n in herhaald:
+                if (endpoint, sql) not in self.gemeld:
+                    self.gemeld.add((endpoint, sql))
+                    nieuw.append((sql, n))
+        # every repeated query is logged once per process, the counter keeps going
+        for sql, n in nieuw:
+            self.logger.warning('herhaalde query, mogelijk n+1', extra={'endpoint': endpoint, 'aantal': n, 'query': sql})
+        if self.traag_ms and duur * 1000 > self.traag_ms:
+            self.logger.warning('trage request', extra={'endpoint': endpoint, 'methode': request.method, 'status': status,
+                                                        'ms': round(duur * 1000, 1), 'queries': aantal,
+                                                        'sql_ms': round(meting['sql'] * 1000, 1)})
+
+    def histogram(self, regels, naam, reeksen):
+        for sleutel, histogram in sorted(reeksen.items()):
+            totaal = 0
+            for grens, aantal in zip(histogram.grenzen + ('+Inf',), histogram.emmers):
+                totaal += aantal
+                regels.append(f'{naam}_bucket{labels(**dict(sleutel), le=grens)} {totaal}')
+            regels.append(f'{naam}_sum{labels(**dict(sleutel))} {histogram.som}')
+            regels.append(f'{naam}_count{labels(**dict(sleutel))} {histogram.aantal}')
+
+    def prometheus(self):
+        w = self.worker
+        with self.lock:
+            regels = ['# HELP hro_requests_total Afgehandelde requests.', '# TYPE hro_requests_total counter']
+            regels += [f'hro_requests_total{labels(endpoint=e, method=m, status=s, worker=w)} {n}'
+                       for (e, m, s), n in sorted(self.verzoeken.items())]
+            regels += ['# HELP hro_request_duration_seconds Duur van een request tot de response klaar is.',
+                       '# TYPE hro_request_duration_seconds histogram']
+            self.histogram(regels, 'hro_request_duration_seconds',
+                           {(('endpoint', e), ('method', m), ('worker', w)): h for (e, m), h in self.latentie.items()})
+            regels += ['# HELP hro_request_queries SQL queries per request.', '# TYPE hro_request_queries histogram']
+            self.histogram(regels, 'hro_request_queries', {(('endpoint', e), ('worker', w)): h for e, h in self.queries.items()})
+            regels += ['# HELP hro_request_sql_seconds Tijd in SQL per request.', '# TYPE hro_request_sql_seconds histogram']
+            self.histogram(regels, 'hro_request_sql_seconds', {(('endpoint', e), ('worker', w)): h for e, h in self.sql_tijd.items()})
+            regels += ['# HELP hro_n_plus_1_total Requests die dezelfde query vaker dan de drempel uitvoerden.',
+                       '# TYPE hro_n_plus_1_total counter']
+            regels += [f'hro_n_plus_1_total{labels(endpoint=e, worker=w)} {n}' for e, n in sorted(self.herhaald.items())]
+        return '\n'.join(regels) + '\n'
+
+
+# log lines with the fields passed in extra, as key=value behind the message or as one json object per line
+class LogFormatter(logging.Formatter):
+    standaard = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+    def __init__(self, als_json=False):
+        super().__init__('[%(asctime)s] %(levelname)s in %(module)s: %(message)s')
+        self.als_json = als_json
+
+    def format(self, record):
+        velden = {naam: waarde for naam, waarde in vars(record).items() if naam not in self.standaard}
+        if not self.als_json:
+            tekst = super().format(record)
+            return ' '.join([tekst] + [f'{naam}={waarde}' for naam, waarde in velden.items()])
+        regel = {'tijd': self.formatTime(record), 'niveau': record.levelname, 'logger': record.name, 'bericht': record.getMessage()}
+        regel.update(velden)
+        if record.exc_info:
+            regel['fout'] = self.formatException(record.exc_info)
+        return json.dumps(regel, default=str)
+
+
+# replaces the flask handler of the app logger, a second app in the same process replaces the handler of the first
+def logging_instellen(logger, formaat='tekst', niveau='INFO'):
+    for handler in list(logger.handlers):
+        if handler is default_handler or isinstance(handler.formatter, LogFormatter):
+            logger.removeHandler(handler)
+    handler = logging.StreamHandler(wsgi_errors_stream)
+    handler.setFormatter(LogFormatter(formaat == 'json'))
+    logger.addHandler(handler)
+    logger.setLevel(niveau)
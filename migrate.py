@@ -0,0 +1,84 @@
+# versioned schema migrations for hro.sqlite
+# every migrations/NNN_name.sql runs once, PRAGMA user_version keeps the last applied number
+import os
+import sqlite3
+import sys
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+migratiedir = os.path.join(basedir, 'migrations')
+
+# indexes the routes rely on, as (table, leading columns)
+verwachte_indexen = [
+    ('les_inschrijving', ('les_id', 'studentnummer')),
+    ('les_inschrijving', ('studentnummer', 'les_id')),
+    ('les_inschrijving', ('docent_id', 'les_id')),
+    ('klas_inschrijving', ('klascode', 'studentnummer')),
+    ('klas_inschrijving', ('studentnummer',)),
+    ('les', ('datum',)),
+]
+
+
+# (version, path) of every migration file, in order
+def migraties():
+    result = []
+    for naam in sorted(os.listdir(migratiedir)):
+        if naam.endswith('.sql'):
+            result.append((int(naam.split('_')[0]), os.path.join(migratiedir, naam)))
+    return result
+
+
+def laatste_versie():
+    return max((versie for versie, pad in migraties()), default=0)
+
+
+def versie(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+# applies the missing migrations, each one in its own transaction
+def migreer(pad):
+    conn = sqlite3.connect(pad)
+    try:
+        toegepast = []
+        for nummer, bestand in migraties():
+            if nummer <= versie(conn):
+                continue
+            with open(bestand) as f:
+                sql = f.read()
+            # tables are rebuilt, so foreign keys are checked afterwards instead of during the copy
+            conn.execute('PRAGMA foreign_keys = OFF')
+            conn.executescript(f'BEGIN;\n{sql}\nPRAGMA user_version = {nummer};\nCOMMIT;')
+            toegepast.append(os.path.basename(bestand))
+        return toegepast
+    finally:
+        conn.close()
+
+
+# column tuples of every index on a table
+def indexen(conn, tabel):
+    result = []
+    for index in conn.execute(f'PRAGMA index_list({tabel})').fetchall():
+        kolommen = [rij[2] for rij in conn.execute(f'PRAGMA index_info("{index[1]}")').fetchall()]
+        result.append(tuple(kolommen))
+    return result
+
+
+# list of problems with the live database, empty when it is up to date
+def controleer(conn):
+    waarschuwingen = []
+    if versie(conn) < laatste_versie():
+        waarschuwingen.append(f'database schema is versie {versie(conn)}, laatste migratie is {laatste_versie()}, draai python migrate.py')
+    for tabel, kolommen in verwachte_indexen:
+        if not any(index[:len(kolommen)] == kolommen for index in indexen(conn, tabel)):
+            waarschuwingen.append(f'index op {tabel} ({", ".join(kolommen)}) ontbreekt')
+    types = {rij[1]: rij[2] for rij in conn.execute('PRAGMA table_info(les_inschrijving)').fetchall()}
+    if types.get('les_id', '').upper().startswith('INT'):
+        waarschuwingen.append('les_inschrijving.les_id is INTEGER, lessen gebruiken uuid strings')
+    return waarschuwingen
+
+
+if __name__ == '__main__':
+    pad = sys.argv[1] if len(sys.argv) > 1 else os.path.join(basedir, 'hro.sqlite')
+    for bestand in migreer(pad):
+        print(f'toegepast: {bestand}')
+    print(f'{pad} is op versie {laatste_versie()}')
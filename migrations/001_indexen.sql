@@ -0,0 +1,39 @@
+-- les_inschrijving.les_id holds uuid strings, one enrollment per student per lesson,
+-- and indexes for the lookups by lesson, student, teacher and class
+CREATE TABLE les_inschrijving_nieuw (
+	id INTEGER NOT NULL,
+	studentnummer INTEGER NOT NULL,
+	docent_id INTEGER NOT NULL,
+	les_id VARCHAR(100) NOT NULL,
+	aanwezigheid_check INTEGER NOT NULL DEFAULT 'Afwezig',
+	afwezigheid_rede VARCHAR(200),
+	motivatie INTEGER,
+	PRIMARY KEY (id),
+	CONSTRAINT uq_les_inschrijving_les_student UNIQUE (les_id, studentnummer),
+	FOREIGN KEY (studentnummer) REFERENCES student (studentnummer),
+	FOREIGN KEY (docent_id) REFERENCES docent (docent_id),
+	FOREIGN KEY (les_id) REFERENCES les (les_id)
+);
+INSERT INTO les_inschrijving_nieuw (id, studentnummer, docent_id, les_id, aanwezigheid_check, afwezigheid_rede, motivatie)
+	SELECT id, studentnummer, docent_id, les_id, aanwezigheid_check, afwezigheid_rede, motivatie FROM les_inschrijving
+	WHERE id IN (SELECT MIN(id) FROM les_inschrijving GROUP BY les_id, studentnummer);
+DROP TABLE les_inschrijving;
+ALTER TABLE les_inschrijving_nieuw RENAME TO les_inschrijving;
+CREATE INDEX ix_les_inschrijving_student_les ON les_inschrijving (studentnummer, les_id);
+CREATE INDEX ix_les_inschrijving_docent_les ON les_inschrijving (docent_id, les_id);
+
+CREATE TABLE klas_inschrijving_nieuw (
+	klasinschrijving_id INTEGER NOT NULL,
+	studentnummer INTEGER NOT NULL,
+	klascode VARCHAR(150) NOT NULL,
+	PRIMARY KEY (klasinschrijving_id),
+	CONSTRAINT uq_klas_inschrijving_klas_student UNIQUE (klascode, studentnummer),
+	FOREIGN KEY (klascode) REFERENCES klas (klascode),
+	FOREIGN KEY (studentnummer) REFERENCES student (studentnummer)
+);
+INSERT INTO klas_inschrijving_nieuw (klasinschrijving_id, studentnummer, klascode)
+	SELECT klasinschrijving_id, studentnummer, klascode FROM klas_inschrijving
+	WHERE klasinschrijving_id IN (SELECT MIN(klasinschrijving_id) FROM klas_inschrijving GROUP BY klascode, studentnummer);
+DROP TABLE klas_inschrijving;
+ALTER TABLE klas_inschrijving_nieuw RENAME TO klas_inschrijving;
+CREATE INDEX ix_klas_inschrijving_student ON klas_inschrijving (studentnummer);
@@ -0,0 +1,40 @@
+-- attendance rollups per student x vak and klas x vak over closed lessons
+CREATE TABLE statistiek_student_vak (
+	studentnummer INTEGER NOT NULL,
+	vak_id INTEGER NOT NULL,
+	aanwezig INTEGER NOT NULL DEFAULT 0,
+	afgemeld INTEGER NOT NULL DEFAULT 0,
+	onbekend INTEGER NOT NULL DEFAULT 0,
+	PRIMARY KEY (studentnummer, vak_id),
+	FOREIGN KEY (studentnummer) REFERENCES student (studentnummer),
+	FOREIGN KEY (vak_id) REFERENCES vak (vak_id)
+);
+CREATE TABLE statistiek_klas_vak (
+	klascode VARCHAR(150) NOT NULL,
+	vak_id INTEGER NOT NULL,
+	aanwezig INTEGER NOT NULL DEFAULT 0,
+	afgemeld INTEGER NOT NULL DEFAULT 0,
+	onbekend INTEGER NOT NULL DEFAULT 0,
+	PRIMARY KEY (klascode, vak_id),
+	FOREIGN KEY (klascode) REFERENCES klas (klascode),
+	FOREIGN KEY (vak_id) REFERENCES vak (vak_id)
+);
+CREATE INDEX ix_statistiek_klas_vak_vak ON statistiek_klas_vak (vak_id);
+
+INSERT INTO statistiek_student_vak (studentnummer, vak_id, aanwezig, afgemeld, onbekend)
+	SELECT li.studentnummer, les.vak_id,
+		SUM(CASE WHEN li.aanwezigheid_check = 1 THEN 1 ELSE 0 END),
+		SUM(CASE WHEN li.aanwezigheid_check = 2 THEN 1 ELSE 0 END),
+		SUM(CASE WHEN li.aanwezigheid_check IN (1, 2) THEN 0 ELSE 1 END)
+	FROM les_inschrijving li JOIN les ON les.les_id = li.les_id
+	WHERE les.entry = 'closed'
+	GROUP BY li.studentnummer, les.vak_id;
+INSERT INTO statistiek_klas_vak (klascode, vak_id, aanwezig, afgemeld, onbekend)
+	SELECT ki.klascode, les.vak_id,
+		SUM(CASE WHEN li.aanwezigheid_check = 1 THEN 1 ELSE 0 END),
+		SUM(CASE WHEN li.aanwezigheid_check = 2 THEN 1 ELSE 0 END),
+		SUM(CASE WHEN li.aanwezigheid_check IN (1, 2) THEN 0 ELSE 1 END)
+	FROM les_inschrijving li JOIN les ON les.les_id = li.les_id
+	JOIN klas_inschrijving ki ON ki.studentnummer = li.studentnummer
+	WHERE les.entry = 'closed'
+	GROUP BY ki.klascode, les.vak_id;
@@ -0,0 +1,2 @@
+-- date windows on the lesson lists filter and sort on les.datum
+CREATE INDEX ix_les_datum ON les (datum);
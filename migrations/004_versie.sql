@@ -0,0 +1,6 @@
+-- change counters for conditional GET on the polled endpoints
+CREATE TABLE versie (
+	sleutel VARCHAR(200) NOT NULL,
+	versie INTEGER NOT NULL DEFAULT 0,
+	PRIMARY KEY (sleutel)
+);
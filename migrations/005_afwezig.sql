@@ -0,0 +1,3 @@
+-- aanwezigheid_check is an integer column, lessons used to be created with the text 'Afwezig'
+-- 0 is what the screens already show as Afwezig, and it is valid on PostgreSQL too
+UPDATE les_inschrijving SET aanwezigheid_check = 0 WHERE aanwezigheid_check = 'Afwezig';
@@ -0,0 +1,24 @@
+-- les_inschrijving.aanwezigheid_check was rebuilt in 001 with DEFAULT 'Afwezig', so an insert without the column
+-- still stored the text; rebuilt again with DEFAULT 0, the integer the screens show as Afwezig
+CREATE TABLE les_inschrijving_nieuw (
+	id INTEGER NOT NULL,
+	studentnummer INTEGER NOT NULL,
+	docent_id INTEGER NOT NULL,
+	les_id VARCHAR(100) NOT NULL,
+	aanwezigheid_check INTEGER NOT NULL DEFAULT 0,
+	afwezigheid_rede VARCHAR(200),
+	motivatie INTEGER,
+	PRIMARY KEY (id),
+	CONSTRAINT uq_les_inschrijving_les_student UNIQUE (les_id, studentnummer),
+	FOREIGN KEY (studentnummer) REFERENCES student (studentnummer),
+	FOREIGN KEY (docent_id) REFERENCES docent (docent_id),
+	FOREIGN KEY (les_id) REFERENCES les (les_id)
+);
+INSERT INTO les_inschrijving_nieuw (id, studentnummer, docent_id, les_id, aanwezigheid_check, afwezigheid_rede, motivatie)
+	SELECT id, studentnummer, docent_id, les_id,
+		CASE WHEN aanwezigheid_check = 'Afwezig' THEN 0 ELSE aanwezigheid_check END, afwezigheid_rede, motivatie
+	FROM les_inschrijving;
+DROP TABLE les_inschrijving;
+ALTER TABLE les_inschrijving_nieuw RENAME TO les_inschrijving;
+CREATE INDEX ix_les_inschrijving_student_les ON les_inschrijving (studentnummer, les_id);
+CREATE INDEX ix_les_inschrijving_docent_les ON les_inschrijving (docent_id, les_id);
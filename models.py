@@ -0,0 +1,151 @@
+# database models and marshmallow schemas
+from flask_sqlalchemy import SQLAlchemy
+from flask_marshmallow import Marshmallow
+from marshmallow import fields
+from sqlalchemy.dialects import postgresql, sqlite
+
+db = SQLAlchemy()
+ma = Marshmallow()
+
+# INSERT with on_conflict_do_update for the dialect in use
+def upsert(model, dialect=None):
+    if (dialect or db.session.get_bind().dialect.name) == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+#Database models
+class Student(db.Model):
+    studentnummer = db.Column(db.Integer, primary_key=True, unique=True)
+    naam = db.Column(db.String(150), nullable=False)
+    klasinschrijvingen = db.relationship('KlasInschrijving', backref='student', lazy='dynamic')
+    lesinschrijvingen = db.relationship('LesInschrijving', backref='student', lazy=True)
+
+
+class Docent(db.Model):
+    docent_id = db.Column(db.Integer, primary_key=True, unique=True)
+    naam = db.Column(db.String(150), nullable=False)
+    lesinschrijvingen = db.relationship('LesInschrijving', backref='docent', lazy=True)
+
+    def __init__(self, docent_id, naam):
+        self.docent_id = docent_id
+        self.naam = naam
+
+class Klas(db.Model):
+    klascode = db.Column(db.String(150), primary_key=True, nullable=False)
+    slc_docent = db.Column(db.String(150))
+    klasinschrijvingen = db.relationship('KlasInschrijving', backref='klas', lazy=True)
+
+class Vak(db.Model):
+    vak_id = db.Column(db.Integer, primary_key=True, nullable=False)
+    vak = db.Column(db.String(150), nullable=False)
+    les = db.relationship('Les', backref='vak1', lazy=True)
+
+class Les(db.Model):
+    __table_args__ = (db.Index('ix_les_datum', 'datum'),)
+    les_id = db.Column(db.String(100), primary_key=True, nullable=False)
+    vak_id = db.Column(db.Integer, db.ForeignKey('vak.vak_id'), nullable=False)
+    datum = db.Column(db.DateTime, nullable=False)
+    entry = db.Column(db.String(6), nullable=False, default="opened")
+    lesinschrijvingen = db.relationship('LesInschrijving', backref='les', lazy=True)
+
+class KlasInschrijving(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('klascode', 'studentnummer', name='uq_klas_inschrijving_klas_student'),
+        db.Index('ix_klas_inschrijving_student', 'studentnummer'),
+    )
+    klasinschrijving_id = db.Column(db.Integer, primary_key=True, nullable=False)
+    studentnummer = db.Column(db.Integer, db.ForeignKey('student.studentnummer'), nullable=False)
+    klascode = db.Column(db.String(150), db.ForeignKey('klas.klascode'), nullable=False)
+
+class LesInschrijving(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('les_id', 'studentnummer', name='uq_les_inschrijving_les_student'),
+        db.Index('ix_les_inschrijving_student_les', 'studentnummer', 'les_id'),
+        db.Index('ix_les_inschrijving_docent_les', 'docent_id', 'les_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True, unique=True)
+    studentnummer = db.Column(db.Integer, db.ForeignKey('student.studentnummer'), nullable=False)
+    docent_id = db.Column(db.Integer, db.ForeignKey('docent.docent_id'), nullable=False)
+    les_id = db.Column(db.String(100), db.ForeignKey('les.les_id'), nullable=False)
+    aanwezigheid_check = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    afwezigheid_rede = db.Column(db.String(200), nullable=True)
+    motivatie = db.Column(db.Integer, nullable=True)
+
+class gebruikers(db.Model):
+    id = db.Column(db.Integer, primary_key=True, nullable=False, unique=True)
+    # student number or teacher code, so no foreign key to student
+    username = db.Column(db.String(20), nullable=False, unique=True)
+    password = db.Column(db.String(150), nullable=False)
+    rights = db.Column(db.String(20), nullable=False)
+
+# change counter per polled resource (les:<id>, klas:<code>, student:<nr>, docent:<id>, kalender:<soort>:<nr>), see versies.py
+class Versie(db.Model):
+    sleutel = db.Column(db.String(200), primary_key=True)
+    versie = db.Column(db.Integer, nullable=False, default=0)
+
+# attendance rollups of closed lessons, kept up to date by statistiek.py
+class StatistiekStudentVak(db.Model):
+    studentnummer = db.Column(db.Integer, db.ForeignKey('student.studentnummer'), primary_key=True)
+    vak_id = db.Column(db.Integer, db.ForeignKey('vak.vak_id'), primary_key=True)
+    aanwezig = db.Column(db.Integer, nullable=False, default=0)
+    afgemeld = db.Column(db.Integer, nullable=False, default=0)
+    onbekend = db.Column(db.Integer, nullable=False, default=0)
+
+class StatistiekKlasVak(db.Model):
+    klascode = db.Column(db.String(150), db.ForeignKey('klas.klascode'), primary_key=True)
+    vak_id = db.Column(db.Integer, db.ForeignKey('vak.vak_id'), primary_key=True)
+    aanwezig = db.Column(db.Integer, nullable=False, default=0)
+    afgemeld = db.Column(db.Integer, nullable=False, default=0)
+    onbekend = db.Column(db.Integer, nullable=False, default=0)
+
+#Marshmellow schemas
+class StudentSchema(ma.Schema):
+    studentnummer = fields.String()
+    naam = fields.String()
+
+class DocentSchema(ma.Schema):
+    docent_id = fields.Integer()
+    naam = fields.String()
+
+class KlasSchema(ma.Schema):
+    klascode = fields.String()
+    slc_docent = fields.String()
+
+class VakSchema(ma.Schema):
+    vak_id = fields.Integer()
+    vak = fields.String()
+
+class LesSchema(ma.Schema):
+    les_id = fields.String()
+    vak_id = fields.Nested(VakSchema)
+    datum = fields.DateTime()
+
+class KlasInschrijvingSchema(ma.Schema):
+    klasInschrijving_id = fields.Integer()
+    studentnummer = fields.Nested(StudentSchema)
+    klascode = fields.Nested(KlasSchema)
+
+class LesInschrijvingSchema(ma.Schema):
+    id = fields.Integer()
+    studentnummer = fields.Nested(StudentSchema)
+    docent_id = fields.Nested(DocentSchema)
+    les_id = fields.Nested(LesSchema)
+    aanwezigheid_check = fields.Integer()
+    afwezigheid_rede = fields.String()
+    motivatie = fields.Integer()
+
+class gebruikersSchema(ma.Schema):
+    id = fields.Integer()
+    username = fields.Nested(StudentSchema)
+    password = fields.String()
+    rights = fields.String()
+
+# Init schema
+student_schema = StudentSchema(many=True)
+docent_schema = DocentSchema(many=True)
+klas_schema = KlasSchema(many=True)
+les_schema = LesSchema(many=True)
+vak_schema = VakSchema(many=True)
+klasinschrijving_schema = KlasInschrijvingSchema(many=True)
+lesinschrijving_schema = LesInschrijvingSchema(many=True)
+gebruikers_schema = gebruikersSchema(many=True)
@@ -0,0 +1,64 @@
+# check-in qr codes rendered in memory, kept in a bounded lru cache per lesson and token
+import io
+import threading
+from collections import OrderedDict
+
+import qrcode
+import qrcode.image.svg
+
+mimetypes = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+def render(url, formaat):
+    if formaat == 'svg':
+        img = qrcode.make(url, image_factory=qrcode.image.svg.SvgPathImage)
+    else:
+        img = qrcode.make(url)
+    buffer = io.BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
+
+
+# runs a function in a new daemon thread, for a QrCache without a job pool
+def thread(functie, *args):
+    thread = threading.Thread(target=functie, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+class QrCache:
+    # uitvoerder(functie, *args) runs the warming in the background, the job pool of the app passes its own
+    # token(les_id) gives the current check-in token of a lesson, without it the qr holds a fixed url
+    def __init__(self, basis_url, maxsize=256, uitvoerder=thread, token=None):
+        self.basis_url = basis_url
+        self.maxsize = maxsize
+        self.uitvoerder = uitvoerder
+        self.token = token
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def url(self, les_id, token=None):
+        if token is None:
+            return f"{self.basis_url}/inschrijven/{les_id}"
+        return f"{self.basis_url}/inschrijven/{les_id}?t={token}"
+
+    # image bytes for a lesson with its current token, rendered on the first request
+    def get(self, les_id, formaat='png'):
+        token = self.token(les_id) if self.token else None
+        key = (str(les_id), token, formaat)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        data = render(self.url(les_id, token), formaat)
+        with self.lock:
+            self.entries[key] = data
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return data
+
+    # render the png of new lessons in the background
+    def warm(self, les_ids):
+        les_ids = list(les_ids)[:self.maxsize]
+        return self.uitvoerder(lambda: [self.get(les_id) for les_id in les_ids])
@@ -0,0 +1,165 @@
+# read queries for the json endpoints, every loader is a single joined query selecting only the columns of the response
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import case
+
+from models import db, Student, Docent, Klas, Vak, Les, KlasInschrijving, LesInschrijving
+from serialisatie import rijen
+
+
+# bad pagination or date parameters, answered with a 400
+class OngeldigeInvoer(ValueError):
+    pass
+
+
+# keyset pagination: rows after the cursor ordered by sleutels, limiet + 1 rows are read to know if there is a next page
+def pagina(query, sleutels, na=None, limiet=None, datum=None, van=None, tot=None):
+    if van is not None:
+        query = query.where(datum >= van)
+    if tot is not None:
+        query = query.where(datum < tot)
+    if na is not None:
+        waarden = lees_cursor(na, sleutels)
+        voorwaarden = []
+        for i, sleutel in enumerate(sleutels):
+            gelijk = [sleutels[j] == waarden[j] for j in range(i)]
+            voorwaarden.append(db.and_(*gelijk, sleutel > waarden[i]))
+        query = query.where(db.or_(*voorwaarden))
+    query = query.order_by(*sleutels)
+    if limiet is not None and limiet < 1:
+        raise OngeldigeInvoer("Limiet moet minstens 1 zijn")
+    if limiet is not None:
+        query = query.limit(limiet + 1)
+    rows = db.session.execute(query).all()
+    if limiet is not None and len(rows) > limiet:
+        rows = rows[:limiet]
+        laatste = rows[-1]._mapping
+        return rows, maak_cursor([laatste[sleutel] for sleutel in sleutels])
+    return rows, None
+
+
+# cursor as an opaque url-safe string
+def maak_cursor(waarden):
+    tekst = json.dumps([w.isoformat() if isinstance(w, datetime) else w for w in waarden])
+    return base64.urlsafe_b64encode(tekst.encode()).decode()
+
+
+def lees_cursor(cursor, sleutels):
+    try:
+        waarden = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(waarden) != len(sleutels):
+            raise ValueError
+        return [datetime.fromisoformat(w) if isinstance(s.type, db.DateTime) else w for s, w in zip(sleutels, waarden)]
+    except (TypeError, ValueError, binascii.Error):
+        raise OngeldigeInvoer("Ongeldige cursor")
+
+
+# lessons of a student with subject and date
+def studentlessen(studentnummer, **venster):
+    query = (db.select(LesInschrijving.id, LesInschrijving.studentnummer, LesInschrijving.docent_id, LesInschrijving.les_id,
+                       LesInschrijving.aanwezigheid_check, LesInschrijving.afwezigheid_rede, Les.vak_id, Les.datum, Vak.vak)
+             .select_from(LesInschrijving)
+             .join(Les, Les.les_id == LesInschrijving.les_id)
+             .join(Vak, Vak.vak_id == Les.vak_id)
+             .where(LesInschrijving.studentnummer == studentnummer))
+    rows, volgende = pagina(query, [Les.datum, LesInschrijving.id], datum=Les.datum, **venster)
+    return rijen(("id", "studentnummer", "docent_id", "les_id", "aanwezigheid", "afwezigheid_reden", "vak_id", "datum", "vak"),
+                 rows), volgende
+
+
+# distinct lessons a teacher has students enrolled in
+def docentlessen(docent_id, **venster):
+    query = (db.select(Les.vak_id, Les.les_id, Les.datum, Vak.vak, Docent.naam)
+             .select_from(LesInschrijving)
+             .join(Les, Les.les_id == LesInschrijving.les_id)
+             .join(Vak, Vak.vak_id == Les.vak_id)
+             .join(Docent, Docent.docent_id == LesInschrijving.docent_id)
+             .where(LesInschrijving.docent_id == docent_id)
+             .distinct())
+    rows, volgende = pagina(query, [Les.datum, Les.les_id], datum=Les.datum, **venster)
+    return rijen(("vak_id", "les_id", "datum", "vak", "docent"), rows), volgende
+
+
+# attendance of a student for every closed lesson
+def studentoverzicht(studentnummer, **venster):
+    query = (db.select(Vak.vak, Docent.naam, Les.datum, LesInschrijving.aanwezigheid_check, LesInschrijving.id)
+             .select_from(LesInschrijving)
+             .join(Les, Les.les_id == LesInschrijving.les_id)
+             .join(Vak, Vak.vak_id == Les.vak_id)
+             .join(Docent, Docent.docent_id == LesInschrijving.docent_id)
+             .where(LesInschrijving.studentnummer == studentnummer, Les.entry == "closed"))
+    rows, volgende = pagina(query, [Les.datum, LesInschrijving.id], datum=Les.datum, **venster)
+    return rijen(("Vak", "Docent", "Datum", "Aanwezig"), rows), volgende
+
+
+# lessons of a student as shown on the class page
+def klaslessen(studentnummer, **venster):
+    query = (db.select(Docent.naam, Vak.vak, Les.datum, LesInschrijving.id)
+             .select_from(LesInschrijving)
+             .join(Les, Les.les_id == LesInschrijving.les_id)
+             .join(Vak, Vak.vak_id == Les.vak_id)
+             .join(Docent, Docent.docent_id == LesInschrijving.docent_id)
+             .where(LesInschrijving.studentnummer == studentnummer))
+    rows, volgende = pagina(query, [Les.datum, LesInschrijving.id], datum=Les.datum, **venster)
+    return rijen(("Docent", "Vak", "Datum"), rows), volgende
+
+
+# students of a class
+def klasstudenten(klascode, na=None, limiet=None):
+    query = (db.select(Student.naam, Student.studentnummer)
+             .join(KlasInschrijving, KlasInschrijving.studentnummer == Student.studentnummer)
+             .where(KlasInschrijving.klascode == klascode))
+    rows, volgende = pagina(query, [Student.studentnummer], na=na, limiet=limiet)
+    return rijen(("naam", "studentnummer"), rows), volgende
+
+
+# roster of a lesson ordered by attendance, students that did not respond (0) last
+def lesaanwezigheid(les_id):
+    query = (db.select(Student.naam, Student.studentnummer, LesInschrijving.aanwezigheid_check,
+                       LesInschrijving.afwezigheid_rede, LesInschrijving.motivatie)
+             .select_from(LesInschrijving)
+             .join(Student, Student.studentnummer == LesInschrijving.studentnummer)
+             .where(LesInschrijving.les_id == les_id)
+             .order_by(case((LesInschrijving.aanwezigheid_check == 0, 1), else_=0), LesInschrijving.aanwezigheid_check, LesInschrijving.id))
+    return rijen(("naam", "studentnummer", "aanwezigheid", "afwezigheid_reden", "motivatie"), db.session.execute(query))
+
+
+# number of present students in a lesson
+def aanwezigcount(les_id):
+    query = (db.select(db.func.count())
+             .select_from(LesInschrijving)
+             .where(LesInschrijving.les_id == les_id, LesInschrijving.aanwezigheid_check == 1))
+    return db.session.execute(query).scalar()
+
+
+# student numbers of every student in the given classes
+def klasstudentnummers(klascodes):
+    if not klascodes:
+        return set()
+    query = db.select(KlasInschrijving.studentnummer).where(KlasInschrijving.klascode.in_(klascodes))
+    return set(db.session.execute(query).scalars())
+
+
+
+# reference lists, cached in main.py
+def studenten():
+    query = db.select(Student.studentnummer, Student.naam).order_by(Student.studentnummer)
+    return rijen(("studentnummer", "naam"), db.session.execute(query))
+
+
+def klassen():
+    query = db.select(Klas.klascode, Klas.slc_docent).order_by(Klas.klascode)
+    return rijen(("klascode", "slc_docent"), db.session.execute(query))
+
+
+def vakken():
+    query = db.select(Vak.vak_id, Vak.vak).order_by(Vak.vak_id)
+    return rijen(("vak_id", "vak"), db.session.execute(query))
+
+
+def docenten():
+    query = db.select(Docent.docent_id, Docent.naam).order_by(Docent.docent_id)
+    return rijen(("docent_id", "naam"), db.session.execute(query))
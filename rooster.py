@@ -0,0 +1,146 @@
+# bulk import of class rosters: one row per student per class (studentnummer, naam, klascode)
+# students are added or renamed, classes are created, and the classes in the roster get exactly these members,
+# students are never deleted because their attendance history refers to them
+import codecs
+import csv
+import io
+import json
+import time
+
+from models import db, Student, Klas, KlasInschrijving
+from queries import OngeldigeInvoer
+import versies
+
+blok = 5000
+
+
+# text of an uploaded file: utf-8 (with or without bom), utf-16 with a bom, otherwise cp1252 as saved by excel
+def lees_tekst(data):
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        codering = 'utf-16'
+    else:
+        try:
+            return data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            codering = 'cp1252'
+    try:
+        return data.decode(codering)
+    except UnicodeDecodeError:
+        raise OngeldigeInvoer("Bestand is geen utf-8, utf-16 of cp1252 tekst")
+
+
+def lees_csv(tekst):
+    reader = csv.DictReader(io.StringIO(tekst))
+    # line_num is the file line a row ends on, the header is line 1
+    return lees_rijen((reader.line_num, rij) for rij in reader)
+
+
+def lees_json(tekst):
+    try:
+        rijen = json.loads(tekst)
+    except ValueError:
+        raise OngeldigeInvoer("Geen geldige JSON")
+    if not isinstance(rijen, list) or not all(isinstance(rij, dict) for rij in rijen):
+        raise OngeldigeInvoer("JSON moet een lijst van objecten zijn")
+    return lees_rijen(enumerate(rijen, start=1))
+
+
+formaten = {'csv': lees_csv, 'json': lees_json}
+
+
+# (studentnummer, naam, klascode) tuples from (line number, row) pairs, every problem is reported with its line number
+def lees_rijen(rijen):
+    result = []
+    for regel, rij in rijen:
+        nummer = str(rij.get('studentnummer') or '').strip()
+        naam = str(rij.get('naam') or '').strip()
+        klascode = str(rij.get('klascode') or '').strip()
+        if not nummer.isdigit():
+            raise OngeldigeInvoer(f"Regel {regel}: ongeldig studentnummer '{nummer}'")
+        if not naam or not klascode:
+            raise OngeldigeInvoer(f"Regel {regel}: naam en klascode zijn verplicht")
+        if len(naam) > 150 or len(klascode) > 150:
+            raise OngeldigeInvoer(f"Regel {regel}: naam of klascode langer dan 150 tekens")
+        result.append((int(nummer), naam, klascode))
+    return result
+
+
+# what has to change to make the database match the roster
+def verschil(rijen):
+    namen = {}
+    for nummer, naam, klascode in rijen:
+        if namen.setdefault(nummer, naam) != naam:
+            raise OngeldigeInvoer(f"Studentnummer {nummer} heeft twee namen: '{namen[nummer]}' en '{naam}'")
+    leden = {(klascode, nummer) for nummer, naam, klascode in rijen}
+    klassen = {klascode for klascode, nummer in leden}
+
+    bestaand = dict(db.session.execute(db.select(Student.studentnummer, Student.naam)).all())
+    bestaande_klassen = set(db.session.execute(db.select(Klas.klascode)).scalars())
+    huidig = {}
+    codes = sorted(klassen)
+    for i in range(0, len(codes), 500):
+        query = (db.select(KlasInschrijving.klascode, KlasInschrijving.studentnummer, KlasInschrijving.klasinschrijving_id)
+                 .where(KlasInschrijving.klascode.in_(codes[i:i + 500])))
+        huidig.update(((k, nr), id) for k, nr, id in db.session.execute(query))
+
+    return {
+        'studenten_nieuw': [{'studentnummer': nr, 'naam': naam} for nr, naam in namen.items() if nr not in bestaand],
+        'studenten_hernoemd': [{'nummer': nr, 'naam': naam} for nr, naam in namen.items() if nr in bestaand and bestaand[nr] != naam],
+        'klassen_nieuw': [{'klascode': klascode} for klascode in sorted(klassen - bestaande_klassen)],
+        'inschrijvingen_nieuw': [{'klascode': k, 'studentnummer': nr} for k, nr in sorted(leden - huidig.keys())],
+        'inschrijvingen_weg': [{'id': huidig[(k, nr)], 'klascode': k, 'studentnummer': nr} for k, nr in sorted(huidig.keys() - leden)],
+    }
+
+
+def toepassen(wijzigingen):
+    if wijzigingen['studenten_nieuw']:
+        db.session.execute(db.insert(Student), wijzigingen['studenten_nieuw'])
+    if wijzigingen['studenten_hernoemd']:
+        db.session.execute(db.update(Student.__table__).where(Student.studentnummer == db.bindparam('nummer')),
+                           wijzigingen['studenten_hernoemd'])
+    if wijzigingen['klassen_nieuw']:
+        db.session.execute(db.insert(Klas), wijzigingen['klassen_nieuw'])
+    if wijzigingen['inschrijvingen_nieuw']:
+        db.session.execute(db.insert(KlasInschrijving), wijzigingen['inschrijvingen_nieuw'])
+    weg = [rij['id'] for rij in wijzigingen['inschrijvingen_weg']]
+    for i in range(0, len(weg), blok):
+        db.session.execute(db.delete(KlasInschrijving).where(KlasInschrijving.klasinschrijving_id.in_(weg[i:i + blok])))
+
+
+# change counters of the lists that changed, a roster without changes leaves every cache valid
+def verhoog_versies(wijzigingen):
+    if not any(wijzigingen.values()):
+        return
+    inschrijvingen = wijzigingen['inschrijvingen_nieuw'] + wijzigingen['inschrijvingen_weg']
+    hernoemd = sorted(rij['nummer'] for rij in wijzigingen['studenten_hernoemd'])
+    klassen = {rij['klascode'] for rij in inschrijvingen}
+    # a new name shows in the member list of every class of that student
+    for i in range(0, len(hernoemd), blok):
+        query = db.select(KlasInschrijving.klascode).where(KlasInschrijving.studentnummer.in_(hernoemd[i:i + blok])).distinct()
+        klassen.update(db.session.execute(query).scalars())
+    studenten = {rij['studentnummer'] for rij in inschrijvingen}.union(hernoemd)
+    versies.verhoog('referentie', *(f'klas:{k}' for k in klassen), *(f'student:{nr}' for nr in studenten))
+
+
+# imports a roster in one transaction, dry_run only reports what would change
+def importeer(rijen, dry_run=False):
+    tijden = {}
+    start = time.perf_counter()
+    try:
+        wijzigingen = verschil(rijen)
+        tijden['verschil_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        if dry_run:
+            db.session.rollback()
+        else:
+            start = time.perf_counter()
+            toepassen(wijzigingen)
+            verhoog_versies(wijzigingen)
+            db.session.commit()
+            tijden['toepassen_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    except Exception:
+        db.session.rollback()
+        raise
+    rapport = {'dry_run': dry_run, 'rijen': len(rijen)}
+    rapport.update({naam: len(lijst) for naam, lijst in wijzigingen.items()})
+    rapport.update(tijden)
+    return rapport
@@ -0,0 +1,139 @@
+# server-side sessions, the cookie only carries a random id and the data (user, rights, url) stays here
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+
+class ServerSessie(CallbackDict, SessionMixin):
+    def __init__(self, data=None, sid=None):
+        def on_update(sessie):
+            sessie.modified = True
+        super().__init__(data, on_update)
+        self.new = sid is None
+        self.sid = sid or secrets.token_urlsafe(32)
+        self.oud_sid = None
+        self.modified = False
+
+    # new id for the same data, after login so an id known before login is worthless
+    def vernieuw(self):
+        if not self.new and self.oud_sid is None:
+            self.oud_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+# per process, the least recently used sessions are dropped when there are more than maxsize
+class GeheugenOpslag:
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.sessies = OrderedDict()
+
+    def get(self, sid):
+        with self.lock:
+            entry = self.sessies.get(sid)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self.sessies[sid]
+                return None
+            self.sessies.move_to_end(sid)
+            return dict(entry[0])
+
+    def set(self, sid, data, verloopt):
+        with self.lock:
+            self.sessies[sid] = (dict(data), verloopt)
+            self.sessies.move_to_end(sid)
+            while len(self.sessies) > self.maxsize:
+                self.sessies.popitem(last=False)
+
+    def delete(self, sid):
+        with self.lock:
+            self.sessies.pop(sid, None)
+
+
+# one sqlite file shared by all worker processes on a machine
+class SqliteOpslag:
+    def __init__(self, pad):
+        self.pad = pad
+        self.lokaal = threading.local()
+        self.conn().execute('CREATE TABLE IF NOT EXISTS sessie (sid TEXT PRIMARY KEY, data TEXT NOT NULL, verloopt REAL NOT NULL)')
+
+    # a connection per thread, autocommit
+    def conn(self):
+        conn = getattr(self.lokaal, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.pad, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute('PRAGMA busy_timeout = 5000')
+            self.lokaal.conn = conn
+        return conn
+
+    def get(self, sid):
+        rij = self.conn().execute('SELECT data FROM sessie WHERE sid = ? AND verloopt >= ?', (sid, time.time())).fetchone()
+        return json.loads(rij[0]) if rij else None
+
+    def set(self, sid, data, verloopt):
+        self.conn().execute('INSERT OR REPLACE INTO sessie (sid, data, verloopt) VALUES (?, ?, ?)', (sid, json.dumps(dict(data)), verloopt))
+
+    def delete(self, sid):
+        self.conn().execute('DELETE FROM sessie WHERE sid = ?', (sid,))
+
+    # removes expired sessions, called now and then when a session is written
+    def opruimen(self):
+        self.conn().execute('DELETE FROM sessie WHERE verloopt < ?', (time.time(),))
+
+
+class ServerSessieInterface(SessionInterface):
+    def __init__(self, opslag):
+        self.opslag = opslag
+        self.schrijfacties = 0
+
+    # stores a session directly and returns its id, for load tests that skip the login
+    def maak(self, app, data):
+        sessie = ServerSessie(data)
+        self.opslag.set(sessie.sid, sessie, time.time() + app.permanent_session_lifetime.total_seconds())
+        return sessie.sid
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        data = self.opslag.get(sid) if sid else None
+        if data is None:
+            return ServerSessie()
+        return ServerSessie(data, sid)
+
+    def save_session(self, app, session, response):
+        naam = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.oud_sid is not None:
+            self.opslag.delete(session.oud_sid)
+        if not session:
+            if session.modified and not session.new:
+                self.opslag.delete(session.sid)
+                response.delete_cookie(naam, domain=domain, path=path)
+            return
+        if not session.modified:
+            return
+        self.opslag.set(session.sid, session, time.time() + app.permanent_session_lifetime.total_seconds())
+        self.schrijfacties += 1
+        if self.schrijfacties % 1000 == 0 and hasattr(self.opslag, 'opruimen'):
+            self.opslag.opruimen()
+        response.set_cookie(naam, session.sid, expires=self.get_expiration_time(app, session), httponly=self.get_cookie_httponly(app),
+                            domain=domain, path=path, secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app))
+
+
+# store chosen with SESSIE_OPSLAG: 'geheugen' (one process) or 'sqlite' (shared between workers)
+def opslag(app):
+    if app.config['SESSIE_OPSLAG'] == 'sqlite':
+        return SqliteOpslag(app.config['SESSIE_PAD'])
+    if app.config['SESSIE_OPSLAG'] == 'geheugen':
+        return GeheugenOpslag(app.config['SESSIE_MAX'])
+    raise ValueError(f"onbekende SESSIE_OPSLAG {app.config['SESSIE_OPSLAG']}")
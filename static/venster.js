@@ -0,0 +1,59 @@
+// week window and cursor paging for the list endpoints
+
+// monday 00:00 of the week that contains datum
+function maandag(datum) {
+    let d = new Date(datum)
+    d.setHours(0, 0, 0, 0)
+    d.setDate(d.getDate() - (d.getDay() + 6) % 7)
+    return d
+}
+
+// JJJJ-MM-DD in local time
+function datum_param(d) {
+    return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, "0")}-${String(d.getDate()).padStart(2, "0")}`
+}
+
+let weekstart = maandag(new Date())
+
+// van/tot query string for the current week
+function week_param() {
+    let zondag = new Date(weekstart)
+    zondag.setDate(zondag.getDate() + 6)
+    return `van=${datum_param(weekstart)}&tot=${datum_param(zondag)}`
+}
+
+// move the window a number of weeks and show it in the element with id "week"
+function verschuif_week(aantal, callback) {
+    weekstart.setDate(weekstart.getDate() + 7 * aantal)
+    toon_week()
+    callback()
+}
+
+function toon_week() {
+    let label = document.getElementById("week")
+    if (label !== null) {
+        label.innerHTML = `Week van ${datum_param(weekstart)}`
+    }
+}
+
+// every page of a list, following the X-Volgende cursor
+async function fetch_alle(url) {
+    let items = []
+    let na = null
+    do {
+        let pagina = url + (url.includes("?") ? "&" : "?") + (na ? `na=${encodeURIComponent(na)}` : "")
+        const response = await fetch(pagina, {
+            method: 'GET',
+            headers: {
+                'accept': 'application/json',
+                'Content-Type': 'application/json'
+            }
+        })
+        if (!response.ok) {
+            throw new Error("Some non-200 HTTP response code")
+        }
+        items = items.concat(await response.json())
+        na = response.headers.get("X-Volgende")
+    } while (na)
+    return items
+}
@@ -0,0 +1,121 @@
+# attendance rollups per student x vak and klas x vak, counted over closed lessons
+from sqlalchemy import case
+
+from models import db, upsert, Vak, Les, KlasInschrijving, LesInschrijving, StatistiekStudentVak, StatistiekKlasVak
+
+kolommen = ('aanwezig', 'afgemeld', 'onbekend')
+
+
+# aanwezigheid_check 1 is present, 2 is signed off with a reason, anything else never responded
+def kolom(aanwezigheid_check):
+    if str(aanwezigheid_check) == '1':
+        return 'aanwezig'
+    if str(aanwezigheid_check) == '2':
+        return 'afgemeld'
+    return 'onbekend'
+
+
+def tellingen():
+    check = LesInschrijving.aanwezigheid_check
+    return (db.func.sum(case((check == 1, 1), else_=0)).label('aanwezig'),
+            db.func.sum(case((check == 2, 1), else_=0)).label('afgemeld'),
+            db.func.sum(case((check.in_([1, 2]), 0), else_=1)).label('onbekend'))
+
+
+# insert rows or add their counts to the existing ones
+def tel_op(model, sleutels, rijen):
+    if not rijen:
+        return
+    stmt = upsert(model).values(rijen)
+    stmt = stmt.on_conflict_do_update(index_elements=sleutels,
+                                      set_={k: getattr(model, k) + getattr(stmt.excluded, k) for k in kolommen})
+    db.session.execute(stmt)
+
+
+def student_query():
+    return (db.select(LesInschrijving.studentnummer, Les.vak_id, *tellingen())
+            .select_from(LesInschrijving)
+            .join(Les, Les.les_id == LesInschrijving.les_id)
+            .group_by(LesInschrijving.studentnummer, Les.vak_id))
+
+
+def klas_query():
+    return (db.select(KlasInschrijving.klascode, Les.vak_id, *tellingen())
+            .select_from(LesInschrijving)
+            .join(Les, Les.les_id == LesInschrijving.les_id)
+            .join(KlasInschrijving, KlasInschrijving.studentnummer == LesInschrijving.studentnummer)
+            .group_by(KlasInschrijving.klascode, Les.vak_id))
+
+
+# adds (teken 1) or removes (teken -1) all enrollments of a lesson, used when it closes or reopens
+def les_rollup(les_id, teken=1):
+    for model, sleutels, query in ((StatistiekStudentVak, ['studentnummer', 'vak_id'], student_query()),
+                                   (StatistiekKlasVak, ['klascode', 'vak_id'], klas_query())):
+        rijen = []
+        for rij in db.session.execute(query.where(LesInschrijving.les_id == str(les_id))).mappings():
+            rij = dict(rij)
+            for k in kolommen:
+                rij[k] = (rij[k] or 0) * teken
+            rijen.append(rij)
+        tel_op(model, sleutels, rijen)
+        # rows that only counted this lesson are gone after a rebuild as well
+        if teken < 0:
+            db.session.execute(db.delete(model).where(*(getattr(model, k) == 0 for k in kolommen)))
+
+
+# moves one student from the old to the new column after a change in a closed lesson
+def wijzig(les_id, studentnummer, oud, nieuw):
+    if kolom(oud) == kolom(nieuw):
+        return
+    vak_id = db.session.execute(db.select(Les.vak_id).where(Les.les_id == str(les_id))).scalar()
+    delta = {k: 0 for k in kolommen}
+    delta[kolom(oud)] -= 1
+    delta[kolom(nieuw)] += 1
+    tel_op(StatistiekStudentVak, ['studentnummer', 'vak_id'], [dict(delta, studentnummer=int(studentnummer), vak_id=vak_id)])
+    klassen = db.session.execute(db.select(KlasInschrijving.klascode).where(KlasInschrijving.studentnummer == int(studentnummer))).scalars()
+    tel_op(StatistiekKlasVak, ['klascode', 'vak_id'], [dict(delta, klascode=klascode, vak_id=vak_id) for klascode in klassen])
+
+
+# recomputes both rollups from les_inschrijving, classes use their current members
+def herbouw():
+    db.session.execute(db.delete(StatistiekStudentVak))
+    db.session.execute(db.delete(StatistiekKlasVak))
+    for model, query in ((StatistiekStudentVak, student_query()), (StatistiekKlasVak, klas_query())):
+        query = query.where(Les.entry == 'closed')
+        namen = [c.name for c in query.selected_columns]
+        db.session.execute(db.insert(model).from_select(namen, query))
+    db.session.commit()
+
+
+def rij(naam, telling):
+    totaal = telling.aanwezig + telling.afgemeld + telling.onbekend
+    percentage = round(telling.aanwezig / totaal * 100, 1) if totaal else None
+    return {naam: getattr(telling, naam), "vak": telling.vak, "aanwezig": telling.aanwezig, "afgemeld": telling.afgemeld,
+            "onbekend": telling.onbekend, "totaal": totaal, "percentage": percentage}
+
+
+# attendance of a student per vak
+def student(studentnummer):
+    query = (db.select(StatistiekStudentVak.studentnummer, Vak.vak, StatistiekStudentVak.aanwezig, StatistiekStudentVak.afgemeld, StatistiekStudentVak.onbekend)
+             .join(Vak, Vak.vak_id == StatistiekStudentVak.vak_id)
+             .where(StatistiekStudentVak.studentnummer == studentnummer)
+             .order_by(Vak.vak))
+    return [rij('studentnummer', telling) for telling in db.session.execute(query)]
+
+
+# attendance of a class per vak
+def klas(klascode):
+    query = (db.select(StatistiekKlasVak.klascode, Vak.vak, StatistiekKlasVak.aanwezig, StatistiekKlasVak.afgemeld, StatistiekKlasVak.onbekend)
+             .join(Vak, Vak.vak_id == StatistiekKlasVak.vak_id)
+             .where(StatistiekKlasVak.klascode == klascode)
+             .order_by(Vak.vak))
+    return [rij('klascode', telling) for telling in db.session.execute(query)]
+
+
+# attendance for a vak per class
+def vak(vak_id):
+    query = (db.select(StatistiekKlasVak.klascode, Vak.vak, StatistiekKlasVak.aanwezig, StatistiekKlasVak.afgemeld, StatistiekKlasVak.onbekend)
+             .join(Vak, Vak.vak_id == StatistiekKlasVak.vak_id)
+             .where(StatistiekKlasVak.vak_id == vak_id)
+             .order_by(StatistiekKlasVak.klascode))
+    return [rij('klascode', telling) for telling in db.session.execute(query)]
@@ -0,0 +1,181 @@
+# background jobs in a sqlite file shared by the worker processes, run by a small thread pool in every process
+# a job is claimed with a lease so a crashed process does not lose it, failures are retried with backoff,
+# jobs with the same groep run one after the other in the order they were added
+import json
+import sqlite3
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+schema = '''
+CREATE TABLE IF NOT EXISTS taak (
+    id INTEGER PRIMARY KEY,
+    soort TEXT NOT NULL,
+    data TEXT NOT NULL,
+    groep TEXT,
+    uniek TEXT UNIQUE,
+    status TEXT NOT NULL DEFAULT 'wachtend',
+    pogingen INTEGER NOT NULL DEFAULT 0,
+    uitvoeren_na REAL NOT NULL,
+    geclaimd_tot REAL,
+    fout TEXT,
+    aangemaakt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_taak_status ON taak (status, uitvoeren_na);
+CREATE INDEX IF NOT EXISTS ix_taak_groep ON taak (groep, id);
+'''
+
+# the oldest job that may run now: waiting and due, or claimed by a process whose lease ran out,
+# and no earlier unfinished job in its groep
+claim_sql = '''
+UPDATE taak SET status = 'bezig', geclaimd_tot = :tot, pogingen = pogingen + 1
+WHERE id = (SELECT t.id FROM taak t
+            WHERE (t.status = 'wachtend' AND t.uitvoeren_na <= :nu OR t.status = 'bezig' AND t.geclaimd_tot < :nu)
+              AND NOT EXISTS (SELECT 1 FROM taak v WHERE v.groep = t.groep AND v.id < t.id AND v.status IN ('wachtend', 'bezig'))
+            ORDER BY t.id LIMIT 1)
+RETURNING id, soort, data, pogingen
+'''
+
+
+class Takenrij:
+    # context: callable giving the context a job runs in (app.app_context), workers 0 runs every job directly when it is added
+    def __init__(self, pad, context, logger, workers=2, pogingen=5, lease=300, poll=1.0, backoff=2):
+        self.pad = pad
+        self.context = context
+        self.logger = logger
+        self.workers = workers
+        self.pogingen = pogingen
+        self.lease = lease
+        self.poll = poll
+        self.backoff = backoff
+        self.soorten = {}
+        self.periodiek = {}
+        self.lokaal_thread = threading.local()
+        self.wakker = threading.Event()
+        self.vrij = threading.Semaphore(workers)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='taak') if workers else None
+        self.conn().executescript(schema)
+
+    # a connection per thread, autocommit
+    def conn(self):
+        conn = getattr(self.lokaal_thread, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.pad, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute('PRAGMA busy_timeout = 5000')
+            self.lokaal_thread.conn = conn
+        return conn
+
+    def registreer(self, soort, functie):
+        self.soorten[soort] = functie
+
+    # adds a job of this soort every interval seconds, once for all processes sharing the file
+    def elke(self, soort, interval):
+        self.periodiek[soort] = [interval, int(time.time() // interval)]
+
+    def start(self):
+        if self.pool is not None:
+            threading.Thread(target=self.run, daemon=True, name='taken').start()
+
+    # data is passed to the job function as keyword arguments, a second job with the same uniek is ignored
+    def voeg_toe(self, soort, data=None, groep=None, uniek=None, na=0):
+        nu = time.time()
+        cursor = self.conn().execute('INSERT OR IGNORE INTO taak (soort, data, groep, uniek, uitvoeren_na, aangemaakt) VALUES (?, ?, ?, ?, ?, ?)',
+                                     (soort, json.dumps(data or {}), groep, uniek, nu + na, nu))
+        if self.pool is None:
+            self.verwerk_alles()
+        else:
+            self.wakker.set()
+        return cursor.lastrowid
+
+    # work for this process only, e.g. warming an in-memory cache, not persisted and not retried;
+    # it takes a worker place like a job, and is skipped (None) when every worker is busy so queued jobs are not delayed
+    def lokaal(self, functie, *args):
+        if self.pool is None:
+            return functie(*args)
+        if not self.vrij.acquire(blocking=False):
+            return None
+        try:
+            future = self.pool.submit(functie, *args)
+        except Exception:
+            self.vrij.release()
+            raise
+        future.add_done_callback(self.lokaal_klaar)
+        return future
+
+    def lokaal_klaar(self, future):
+        self.vrij.release()
+        self.wakker.set()
+
+    def claim(self):
+        nu = time.time()
+        return self.conn().execute(claim_sql, {'nu': nu, 'tot': nu + self.lease}).fetchone()
+
+    def verwerk_alles(self):
+        while (taak := self.claim()) is not None:
+            self.voer_uit(taak)
+
+    def voer_uit(self, taak):
+        id, soort, data, pogingen = taak
+        try:
+            with self.context():
+                self.soorten[soort](**json.loads(data))
+        except Exception as e:
+            if pogingen >= self.pogingen:
+                self.conn().execute("UPDATE taak SET status = 'mislukt', geclaimd_tot = NULL, fout = ? WHERE id = ?",
+                                    (traceback.format_exc(), id))
+                self.logger.error('taak mislukt', extra={'taak': id, 'soort': soort, 'pogingen': pogingen, 'fout': repr(e)})
+            else:
+                self.conn().execute("UPDATE taak SET status = 'wachtend', geclaimd_tot = NULL, fout = ?, uitvoeren_na = ? WHERE id = ?",
+                                    (repr(e), time.time() + self.backoff ** pogingen, id))
+                self.logger.warning('taak opnieuw', extra={'taak': id, 'soort': soort, 'pogingen': pogingen, 'fout': repr(e)})
+        else:
+            self.conn().execute("UPDATE taak SET status = 'klaar', geclaimd_tot = NULL, fout = NULL WHERE id = ?", (id,))
+
+    def plan(self):
+        nu = time.time()
+        for soort, stand in self.periodiek.items():
+            interval, vorige = stand
+            if int(nu // interval) != vorige:
+                stand[1] = int(nu // interval)
+                self.voeg_toe(soort, uniek=f'{soort}:{stand[1]}')
+        # finished jobs are kept a day for inspection
+        if int(nu // 3600) != getattr(self, 'opgeruimd', None):
+            self.opgeruimd = int(nu // 3600)
+            self.conn().execute("DELETE FROM taak WHERE status = 'klaar' AND aangemaakt < ?", (nu - 86400,))
+
+    # claims a job whenever a worker is free, new jobs in this process wake it up, others are seen within poll seconds
+    def run(self):
+        while True:
+            try:
+                self.plan()
+                self.vrij.acquire()
+                taak = self.claim()
+            except Exception:
+                self.vrij.release()
+                self.logger.exception('takenrij')
+                time.sleep(self.poll)
+                continue
+            if taak is None:
+                self.vrij.release()
+                self.wakker.wait(self.poll)
+                self.wakker.clear()
+                continue
+            self.pool.submit(self.klaar_na, taak)
+
+    def klaar_na(self, taak):
+        try:
+            self.voer_uit(taak)
+        finally:
+            self.vrij.release()
+            # a finished job can make the next one in its groep available
+            self.wakker.set()
+
+    # number of jobs per status, for /taken
+    def overzicht(self):
+        tellingen = dict(self.conn().execute('SELECT status, COUNT(*) FROM taak GROUP BY status').fetchall())
+        mislukt = self.conn().execute("SELECT id, soort, data, fout FROM taak WHERE status = 'mislukt' ORDER BY id DESC LIMIT 20").fetchall()
+        return {'aantallen': tellingen, 'mislukt': [{'id': id, 'soort': soort, 'data': json.loads(data), 'fout': fout}
+                                                    for id, soort, data, fout in mislukt]}
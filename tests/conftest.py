@@ -0,0 +1,81 @@
+# every test gets its own copy of hro.sqlite and an app without background threads or rate limits
+# tests that use maak_app also run on PostgreSQL when HRO_DATABASE_URL points at a test database (its name has to
+# contain 'test', the tables there are dropped and refilled from hro.sqlite for every test), otherwise they are skipped
+import os
+import shutil
+import sys
+
+import pytest
+
+repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo)
+
+
+def postgres_url():
+    url = os.environ.get('HRO_DATABASE_URL', '')
+    if not url.startswith('postgresql'):
+        pytest.skip('HRO_DATABASE_URL wijst niet naar PostgreSQL')
+    from sqlalchemy import create_engine
+    from sqlalchemy.engine import make_url
+    if 'test' not in (make_url(url).database or ''):
+        pytest.skip('HRO_DATABASE_URL is geen testdatabase, de naam moet test bevatten')
+    try:
+        engine = create_engine(url)
+        engine.connect().close()
+    except Exception as e:
+        pytest.skip(f'PostgreSQL niet bereikbaar: {e}')
+    return engine
+
+
+# database url of the backend, filled with the contents of hro.sqlite
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def database(request, tmp_path):
+    pad = tmp_path / 'hro.sqlite'
+    shutil.copy(os.path.join(repo, 'hro.sqlite'), pad)
+    if request.param == 'sqlite':
+        yield f'sqlite:///{pad}'
+        return
+    engine = postgres_url()
+    import overzetten
+    from models import db
+    db.metadata.drop_all(engine)
+    overzetten.overzetten(f'sqlite:///{pad}', engine.url.render_as_string(hide_password=False))
+    engine.dispose()
+    yield engine.url.render_as_string(hide_password=False)
+
+
+# create_app on the test database, config overrides the test defaults
+@pytest.fixture
+def maak_app(database, tmp_path, monkeypatch):
+    apps = []
+    monkeypatch.setenv('HRO_SECRET_KEY', 'test-geheim')
+
+    def maak(**config):
+        from main import create_app
+        app = create_app({'SQLALCHEMY_DATABASE_URI': database, 'TAKEN_PAD': str(tmp_path / 'taken.sqlite'),
+                          'TAKEN_WORKERS': 0, 'RATE_LIMIET': False, 'LOG_NIVEAU': 'WARNING', **config})
+        apps.append(app)
+        return app
+    yield maak
+    # connections closed, so the next test can drop the tables
+    from models import db
+    for app in apps:
+        with app.app_context():
+            db.engine.dispose()
+
+
+@pytest.fixture
+def app(maak_app):
+    return maak_app()
+
+
+# test client logged in as this user, on the app fixture unless another app is given
+@pytest.fixture
+def client_als(app):
+    def maak(user, rights, op=None):
+        client = (op or app).test_client()
+        with client.session_transaction() as session:
+            session['user'] = str(user)
+            session['rights'] = rights
+        return client
+    return maak
@@ -0,0 +1,112 @@
+# a check-in is one write transaction: the UPDATE and its change counters commit together
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+import checkintoken
+import versies
+from models import db, Les, LesInschrijving
+
+student = 129
+vak = 1
+
+
+# an open lesson with one enrolled student
+def open_les(app):
+    les_id = str(uuid.uuid4())
+    with app.app_context():
+        db.session.add(Les(les_id=les_id, vak_id=vak, datum=datetime(2023, 9, 1, 9), entry='opened'))
+        db.session.add(LesInschrijving(studentnummer=student, docent_id=901, les_id=les_id, aanwezigheid_check=0))
+        db.session.commit()
+    return les_id
+
+
+def checkin(app, les_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user'] = str(student)
+        session['rights'] = False
+    token = checkintoken.student_token(app.config['SECRET_KEY'], les_id, str(student))
+    return client.post(f'/{les_id}/aanwezig', json={'studentnummer': str(student), 'motivatie': 7, 'token': token})
+
+
+@pytest.mark.parametrize('batch_ms', [0, 5])
+def test_checkin_is_een_transactie(maak_app, batch_ms):
+    app = maak_app(CHECKIN_BATCH_MS=batch_ms)
+    les_id = open_les(app)
+    with app.app_context():
+        engine = db.engine
+        voor = versies.versie(f'les:{les_id}'), versies.versie(f'student:{student}')
+    commits = []
+
+    def teller(conn):
+        commits.append(conn)
+
+    event.listen(engine, 'commit', teller)
+    try:
+        response = checkin(app, les_id)
+    finally:
+        event.remove(engine, 'commit', teller)
+    assert response.status_code == 200
+    assert len(commits) == 1
+    with app.app_context():
+        assert versies.versie(f'les:{les_id}') == voor[0] + 1
+        assert versies.versie(f'student:{student}') == voor[1] + 1
+        assert db.session.execute(db.select(LesInschrijving.aanwezigheid_check).where(LesInschrijving.les_id == les_id)).scalar() == 1
+
+
+def rollup():
+    from models import StatistiekStudentVak, StatistiekKlasVak
+    return [sorted(map(tuple, db.session.execute(db.select(model.__table__)).all())) for model in (StatistiekStudentVak, StatistiekKlasVak)]
+
+
+# check in, close the lesson, reopen it: the rollup follows and always equals a rebuild
+def test_checkin_sluiten_en_heropenen(app, client_als):
+    import statistiek
+    les_id = open_les(app)
+    docent = client_als(901, True)
+    with app.app_context():
+        voor = rollup()
+    assert checkin(app, les_id).status_code == 200
+
+    assert docent.post(f'/les/{les_id}/setentry', json={'state': 'closed'}).status_code == 202
+    with app.app_context():
+        assert db.session.get(Les, les_id).entry == 'closed'
+        gesloten = rollup()
+        rij = next(r for r in statistiek.student(student) if r['vak'] == 'Professionele Vorming')
+        statistiek.herbouw()
+        assert rollup() == gesloten
+    assert gesloten != voor
+    assert rij['aanwezig'] >= 1
+
+    docent.post(f'/les/{les_id}/setentry', json={'state': 'opened'})
+    with app.app_context():
+        assert db.session.get(Les, les_id).entry == 'opened'
+        heropend = rollup()
+        statistiek.herbouw()
+        assert rollup() == heropend
+    assert heropend == voor
+
+
+# tokens signed with the key from the repository can be forged, so that key is reported
+def test_publieke_sleutel_geeft_een_fout(maak_app, monkeypatch, caplog):
+    app = maak_app()
+    assert app.config['SECRET_KEY'] == 'test-geheim'
+    assert 'HRO_SECRET_KEY' not in caplog.text
+    monkeypatch.delenv('HRO_SECRET_KEY')
+    maak_app()
+    assert 'HRO_SECRET_KEY' in caplog.text
+
+
+# an enrollment inserted without aanwezigheid_check gets the integer 0, not the old text default
+def test_inschrijving_zonder_aanwezigheid_is_afwezig(app):
+    les_id = open_les(app)
+    with app.app_context():
+        db.session.execute(db.text('INSERT INTO les_inschrijving (studentnummer, docent_id, les_id) VALUES (130, 901, :les)'),
+                           {'les': les_id})
+        waarde = db.session.execute(db.text('SELECT aanwezigheid_check FROM les_inschrijving WHERE les_id = :les AND studentnummer = 130'),
+                                    {'les': les_id}).scalar_one()
+        db.session.rollback()
+    assert waarde == 0 and isinstance(waarde, int)
@@ -0,0 +1,27 @@
+# teacher screen streams hold a request thread, so they are capped per process and end by themselves
+import pytest
+
+from test_checkin import open_les
+
+
+def test_streams_boven_het_maximum_krijgen_503(maak_app, client_als):
+    app = maak_app(AANWEZIGHEID_STREAMS_MAX=1)
+    les_id = open_les(app)
+    docent = client_als(901, True, app)
+    eerste = docent.get(f'/les/{les_id}/stream', buffered=False)
+    assert eerste.status_code == 200
+    assert docent.get(f'/les/{les_id}/stream').status_code == 503
+    # the place is given back when the first screen goes away
+    eerste.close()
+    tweede = docent.get(f'/les/{les_id}/stream', buffered=False)
+    assert tweede.status_code == 200
+    tweede.close()
+
+
+def test_stream_stopt_na_de_duur(maak_app, client_als):
+    app = maak_app(AANWEZIGHEID_STREAM_S=0.2, AANWEZIGHEID_POLL_S=0)
+    les_id = open_les(app)
+    response = client_als(901, True, app).get(f'/les/{les_id}/stream')
+    tekst = response.get_data(as_text=True)
+    assert tekst.startswith('retry: 1000\n\n')
+    assert 'event: snapshot' in tekst
@@ -0,0 +1,20 @@
+# text where an integer column is expected is refused before the query, postgresql would raise a DataError
+import pytest
+
+
+@pytest.mark.parametrize('url', ['/getoverzicht/abc', '/overzicht/abc', '/statistiek/student/abc', '/statistiek/vak/abc'])
+def test_nummer_in_de_url_moet_een_getal_zijn(client_als, url):
+    assert client_als(901, True).get(url).status_code == 404
+
+
+def test_statistiek_met_een_getal(client_als):
+    docent = client_als(901, True)
+    assert docent.get('/statistiek/student/129').status_code == 200
+    assert docent.get('/statistiek/vak/1').status_code == 200
+
+
+def test_registreren_met_tekst_als_nummer(maak_app):
+    client = maak_app(WTF_CSRF_ENABLED=False).test_client()
+    response = client.post('/register', data={'username': 'abcdef', 'password': 'wachtwoord1234'})
+    assert response.status_code == 200
+    assert b'No valid Studentnummer' in response.data
@@ -0,0 +1,16 @@
+# calendar links are signed with their own secret, a token made with another key shows nothing
+import pytest
+
+import kalender
+import main
+
+
+@pytest.mark.parametrize('geheim', [main.publiek_geheim, 'test-geheim'])
+def test_vervalst_token_geeft_404(maak_app, geheim):
+    client = maak_app(KALENDER_SECRET='kalender-geheim').test_client()
+    assert client.get(f"/kalender/{kalender.token(geheim, 'student', 129)}.ics").status_code == 404
+    assert client.get(f"/kalender/{kalender.token('kalender-geheim', 'student', 129)}.ics").status_code == 200
+
+
+def test_zonder_kalender_geheim_de_secret_key(app):
+    assert app.config['KALENDER_SECRET'] == app.config['SECRET_KEY'] == 'test-geheim'
@@ -0,0 +1,71 @@
+# the list endpoints load with a fixed number of queries, however many rows they return
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from models import db, Docent, Student, Vak, Les, LesInschrijving
+
+docent = 9901
+student = 990001
+vak = 9901
+
+
+# aantal closed lessons of one teacher, each with the student and two classmates enrolled
+def vul(app, aantal):
+    with app.app_context():
+        if db.session.get(Docent, docent) is None:
+            db.session.add_all([Docent(docent_id=docent, naam='Test docent'), Vak(vak_id=vak, vak='Testvak')] +
+                               [Student(studentnummer=student + i, naam=f'Test student {i}') for i in range(3)])
+            db.session.flush()
+        lessen = [{'les_id': str(uuid.uuid4()), 'vak_id': vak, 'datum': datetime(2023, 9, 1, 9) + timedelta(days=i), 'entry': 'closed'}
+                  for i in range(aantal)]
+        db.session.execute(db.insert(Les), lessen)
+        db.session.execute(db.insert(LesInschrijving), [{'studentnummer': student + i, 'docent_id': docent, 'les_id': les['les_id'],
+                                                         'aanwezigheid_check': 1} for les in lessen for i in range(3)])
+        db.session.commit()
+
+
+# number of sql statements one request runs, and its json
+def tel(app, client, url):
+    aantal = 0
+
+    def teller(*args):
+        nonlocal aantal
+        aantal += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', teller)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', teller)
+    assert response.status_code == 200
+    return aantal, response.json
+
+
+@pytest.mark.parametrize('url, als', [
+    ('/getstudentlessen?limiet=500', (student, False)),
+    ('/getlessen?limiet=500', (docent, True)),
+    (f'/getoverzicht/{student}?limiet=500', (docent, True)),
+])
+def test_queries_per_request_hangen_niet_af_van_het_aantal_rijen(app, client_als, url, als):
+    client = client_als(*als)
+    vul(app, 10)
+    weinig, lijst = tel(app, client, url)
+    assert len(lijst) == 10
+    vul(app, 90)
+    veel, lijst = tel(app, client, url)
+    assert len(lijst) == 100
+    assert veel == weinig
+
+
+@pytest.mark.parametrize('limiet', ['0', '-1'])
+def test_limiet_onder_de_een_geeft_een_rij(app, client_als, limiet):
+    vul(app, 3)
+    response = client_als(student, False).get(f'/getstudentlessen?limiet={limiet}')
+    assert response.status_code == 200
+    assert len(response.json) == 1
+    assert 'X-Volgende' in response.headers
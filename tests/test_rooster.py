@@ -0,0 +1,52 @@
+# roster uploads in the encodings excel saves, and errors pointing at the right line of the file
+import io
+
+import pytest
+
+import rooster
+from queries import OngeldigeInvoer
+
+csv_tekst = 'studentnummer,naam,klascode\r\n990101,Zoë Élan,TI1Z\r\n990102,Jan Smit,TI1Z\r\n'
+
+
+# teacher client and the csrf header the import asks for
+def docent_met_token(client_als):
+    docent = client_als(901, True)
+    return docent, {'X-CSRFToken': docent.get('/import/rooster').json['csrf_token']}
+
+
+@pytest.mark.parametrize('codering', ['utf-8', 'utf-8-sig', 'utf-16', 'cp1252'])
+def test_upload_in_elke_codering(client_als, codering):
+    docent, headers = docent_met_token(client_als)
+    data = {'bestand': (io.BytesIO(csv_tekst.encode(codering)), 'klassen.csv')}
+    response = docent.post('/import/rooster?dry_run=1', data=data, content_type='multipart/form-data', headers=headers)
+    assert response.status_code == 200
+    assert response.json['studenten_nieuw'] == 2
+    assert rooster.lees_tekst(csv_tekst.encode(codering)) == csv_tekst
+
+
+def test_upload_zonder_tekst_geeft_400(client_als):
+    docent, headers = docent_met_token(client_als)
+    data = {'bestand': (io.BytesIO(b'studentnummer,naam,klascode\n1,\x81\x8d,TI1Z\n'), 'klassen.csv')}
+    response = docent.post('/import/rooster?dry_run=1', data=data, content_type='multipart/form-data', headers=headers)
+    assert response.status_code == 400
+    assert 'cp1252' in response.json
+
+
+# a form or fetch from another site has the session cookie at most, not the token
+@pytest.mark.parametrize('content_type', ['multipart/form-data', 'text/plain'])
+def test_import_zonder_csrf_token_geeft_400(app, client_als, content_type):
+    docent = client_als(901, True)
+    data = {'bestand': (io.BytesIO(csv_tekst.encode()), 'klassen.csv')} if content_type == 'multipart/form-data' else csv_tekst
+    response = docent.post('/import/rooster', data=data, content_type=content_type)
+    assert response.status_code == 400
+    assert 'CSRF' in response.json
+    assert app.config['SESSION_COOKIE_SAMESITE'] == 'Lax'
+
+
+def test_regel_is_de_regel_in_het_bestand():
+    with pytest.raises(OngeldigeInvoer, match='Regel 3:'):
+        rooster.lees_csv('studentnummer,naam,klascode\n990101,Jan Smit,TI1Z\nabc,Piet,TI1Z\n')
+    # a quoted name over two lines moves the next rows down
+    with pytest.raises(OngeldigeInvoer, match='Regel 4:'):
+        rooster.lees_csv('studentnummer,naam,klascode\n990101,"Jan\nSmit",TI1Z\nabc,Piet,TI1Z\n')
@@ -0,0 +1,23 @@
+# local work shares the worker places of the job queue, so it cannot push queued jobs back
+import logging
+import threading
+from contextlib import nullcontext
+
+from taken import Takenrij
+
+
+def test_lokaal_wacht_niet_op_een_volle_pool(tmp_path):
+    taken = Takenrij(str(tmp_path / 'taken.sqlite'), nullcontext, logging.getLogger('test'), workers=1)
+    vrij = threading.Event()
+    bezig = taken.lokaal(vrij.wait)
+    try:
+        # the only worker is busy, so this is skipped instead of queued in front of the jobs
+        assert taken.lokaal(lambda: 'warm') is None
+        assert not taken.vrij.acquire(blocking=False)
+    finally:
+        vrij.set()
+    bezig.result(timeout=5)
+    # the place is given back when the work is done
+    assert taken.vrij.acquire(timeout=5)
+    taken.vrij.release()
+    assert taken.lokaal(lambda: 'warm').result(timeout=5) == 'warm'
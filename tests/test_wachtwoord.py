@@ -0,0 +1,31 @@
+# a full hash queue answers at once instead of holding request threads
+import threading
+import time
+
+import pytest
+
+import wachtwoord
+
+
+def test_volle_wachtrij_geeft_te_druk():
+    wachtwoorden = wachtwoord.Wachtwoorden(workers=1, wachtrij=1, timeout=0.05)
+    vrij = threading.Event()
+    bezig = [threading.Thread(target=wachtwoorden.uitvoeren, args=(vrij.wait,)) for _ in range(2)]
+    for thread in bezig:
+        thread.start()
+    time.sleep(0.05)
+    try:
+        start = time.perf_counter()
+        with pytest.raises(wachtwoord.TeDruk):
+            wachtwoorden.uitvoeren(vrij.wait)
+        assert time.perf_counter() - start < 1
+    finally:
+        vrij.set()
+        for thread in bezig:
+            thread.join()
+    assert wachtwoorden.uitvoeren(lambda: 'klaar') == 'klaar'
+
+
+def test_wachtrij_onder_de_request_threads(app):
+    assert app.config['WACHTWOORD_WACHTRIJ'] < 8
+    assert app.extensions['hro']['wachtwoorden'].timeout <= 1
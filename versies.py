@@ -0,0 +1,28 @@
+# change counters per resource, polled endpoints turn them into an etag without reading the data itself
+import hashlib
+
+from models import db, upsert, Versie
+
+
+# bumps the counters, part of the caller's transaction: the session, or conn for code outside a request
+def verhoog(*sleutels, conn=None):
+    sleutels = sorted(set(sleutels))
+    dialect = conn.dialect.name if conn is not None else None
+    # in parts, a bulk import can touch more keys than one statement may have parameters
+    for i in range(0, len(sleutels), 1000):
+        stmt = upsert(Versie, dialect).values([{'sleutel': sleutel, 'versie': 1} for sleutel in sleutels[i:i + 1000]])
+        stmt = stmt.on_conflict_do_update(index_elements=['sleutel'], set_={'versie': Versie.versie + 1})
+        (conn if conn is not None else db.session).execute(stmt)
+
+
+# current counter of one resource, 0 when it never changed
+def versie(sleutel):
+    return db.session.execute(db.select(Versie.versie).where(Versie.sleutel == sleutel)).scalar() or 0
+
+
+# etag over the counters of the given resources and the request (path and query string)
+def etag(sleutels, request_key):
+    query = db.select(Versie.sleutel, Versie.versie).where(Versie.sleutel.in_(sleutels))
+    versies = dict(db.session.execute(query).all())
+    tekst = request_key + '|' + '|'.join(f'{sleutel}={versies.get(sleutel, 0)}' for sleutel in sorted(sleutels))
+    return hashlib.sha1(tekst.encode()).hexdigest()
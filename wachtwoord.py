@@ -0,0 +1,87 @@
+# password hashing with a configurable method and cost, verification runs on a bounded thread pool
+# hashes are strings in the werkzeug formats: pbkdf2:sha256:<iterations>$salt$hash, scrypt:<n>:<r>:<p>$salt$hash,
+# bcrypt keeps its own $2b$<rounds>$... string, old sha256$salt$hash hashes are still accepted
+import hashlib
+import hmac
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# cost per method: iterations (pbkdf2), log2 of n (scrypt) or rounds (bcrypt)
+standaard_kosten = {'pbkdf2': 260000, 'scrypt': 15, 'bcrypt': 12}
+
+
+# too many logins waiting for a hash, the caller answers with a 503
+class TeDruk(Exception):
+    pass
+
+
+def scrypt_hash(wachtwoord, salt, n, r, p):
+    # 128 * n * r bytes of memory, maxmem leaves room above that
+    return hashlib.scrypt(wachtwoord.encode(), salt=salt.encode(), n=n, r=r, p=p, maxmem=256 * n * r, dklen=32).hex()
+
+
+# (method, cost) a hash was made with
+def instellingen(hash):
+    if hash.startswith('$2'):
+        return 'bcrypt', int(hash.split('$')[2])
+    methode = hash.split('$', 1)[0].split(':')
+    if methode[0] == 'pbkdf2':
+        return 'pbkdf2', int(methode[2]) if len(methode) > 2 else 260000
+    if methode[0] == 'scrypt':
+        return 'scrypt', int(methode[1]).bit_length() - 1
+    return methode[0], None
+
+
+def maak_hash(wachtwoord, methode, kosten):
+    if methode == 'bcrypt':
+        return bcrypt.hashpw(wachtwoord.encode(), bcrypt.gensalt(kosten)).decode()
+    if methode == 'scrypt':
+        salt = secrets.token_urlsafe(12)
+        return f'scrypt:{2 ** kosten}:8:1${salt}${scrypt_hash(wachtwoord, salt, 2 ** kosten, 8, 1)}'
+    if methode == 'pbkdf2':
+        return generate_password_hash(wachtwoord, f'pbkdf2:sha256:{kosten}')
+    raise ValueError(f'onbekende wachtwoord methode {methode}')
+
+
+def klopt(hash, wachtwoord):
+    if hash.startswith('$2'):
+        return bcrypt.checkpw(wachtwoord.encode(), hash.encode())
+    if hash.startswith('scrypt:'):
+        methode, salt, verwacht = hash.split('$', 2)
+        n, r, p = (int(x) for x in methode.split(':')[1:])
+        return hmac.compare_digest(scrypt_hash(wachtwoord, salt, n, r, p), verwacht)
+    return check_password_hash(hash, wachtwoord)
+
+
+class Wachtwoorden:
+    # workers threads hash at the same time, at most wachtrij more wait for one, the rest get TeDruk after timeout seconds;
+    # keep wachtrij below the request threads of a process, a thread waiting here cannot serve check-ins
+    # hashlib and bcrypt release the GIL, so the workers use separate cores
+    def __init__(self, methode='pbkdf2', kosten=None, workers=4, wachtrij=4, timeout=0.5):
+        self.methode = methode
+        self.kosten = kosten or standaard_kosten[methode]
+        self.timeout = timeout
+        self.plaatsen = threading.BoundedSemaphore(workers + wachtrij)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wachtwoord')
+
+    def uitvoeren(self, functie, *args):
+        if not self.plaatsen.acquire(timeout=self.timeout):
+            raise TeDruk()
+        try:
+            return self.pool.submit(functie, *args).result()
+        finally:
+            self.plaatsen.release()
+
+    def hash(self, wachtwoord):
+        return self.uitvoeren(maak_hash, wachtwoord, self.methode, self.kosten)
+
+    def controleer(self, hash, wachtwoord):
+        return self.uitvoeren(klopt, hash, wachtwoord)
+
+    # true when the hash was made with another method or cost than configured now, e.g. the old sha256 hashes
+    def verouderd(self, hash):
+        return instellingen(hash) != (self.methode, self.kosten)
@@ -0,0 +1,5 @@
+# production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+# every worker process imports this and gets its own app, connection pool and caches
+from main import create_app
+
+app = create_app()